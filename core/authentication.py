@@ -0,0 +1,132 @@
+"""
+JWT authentication without a per-request user lookup.
+
+SimpleJWT's JWTAuthentication loads the User row on every request. Most
+endpoints only need the user's id and staff flags, so
+TokenUserAuthentication returns a TokenUser built from the access token
+claims (see core.serializers.TokenObtainPairSerializer) and only loads the
+row when something actually needs the model instance.
+
+Deactivation and privilege changes are enforced through a short-lived
+per-user status entry in the default (Redis) cache: a miss costs one small
+query, and saving or deleting a User clears the entry (see core.signals), so
+changes take effect on the next request. Updates that bypass signals
+(queryset.update()) are picked up after USER_STATUS_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+STATUS_FIELDS = ('username', 'is_active', 'is_staff', 'is_superuser')
+MISSING = {'username': '', 'is_active': False, 'is_staff': False, 'is_superuser': False}
+
+
+def _status_key(user_id):
+    return f'core:user-status:{user_id}'
+
+
+def get_status_timeout():
+    return getattr(settings, 'USER_STATUS_CACHE_TIMEOUT', 60)
+
+
+def cache_user_status(user):
+    """Stores the status of a loaded user, e.g. when a token is issued."""
+    status = {field: getattr(user, field) for field in STATUS_FIELDS}
+    cache.set(_status_key(user.pk), status, get_status_timeout())
+    return status
+
+
+def get_user_status(user_id):
+    """
+    Returns the cached username and active/staff/superuser flags of a user.
+
+    Unknown users get a status with is_active False.
+    """
+    status = cache.get(_status_key(user_id))
+    if status is None:
+        status = User.objects.filter(pk=user_id).values(*STATUS_FIELDS).first() or MISSING
+        cache.set(_status_key(user_id), status, get_status_timeout())
+    return status
+
+
+def forget_user_status(user_id):
+    cache.delete(_status_key(user_id))
+
+
+def _load_user(user_id):
+    try:
+        return User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    request.user for token-authenticated requests.
+
+    id, pk, username, is_staff, is_superuser, is_active, is_authenticated and
+    is_anonymous are answered from the token and the status cache. Anything
+    else, including using it as a model instance (FK assignment, comparison
+    with a User, has_perm), loads the User row once.
+    """
+
+    def __init__(self, user_id, username, status):
+        super().__init__(lambda: _load_user(user_id))
+        # Stored in __dict__ directly: LazyObject.__setattr__ would set them on the wrapped user.
+        self.__dict__.update(
+            id=user_id,
+            pk=user_id,
+            username=username,
+            is_active=status['is_active'],
+            is_staff=status['is_staff'],
+            is_superuser=status['is_superuser'],
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return self.username
+
+    def __repr__(self):
+        return f'<TokenUser: {self.id}>'
+
+
+class TokenUserAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication returning a TokenUser instead of loading the User.
+
+    Views that always need the full model instance can set
+    `requires_db_user = True` to get it directly.
+    """
+    requires_db_user = False
+
+    def authenticate(self, request):
+        view = (getattr(request, 'parser_context', None) or {}).get('view')
+        self.requires_db_user = getattr(view, 'requires_db_user', False)
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        status = get_user_status(user_id)
+        if not status['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if self.requires_db_user:
+            return super().get_user(validated_token)
+        # Flags come from the status cache rather than the claims, so a demoted
+        # user loses staff rights before their access token expires.
+        return TokenUser(user_id, validated_token.get('username') or status['username'], status)
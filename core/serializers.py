@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from djoser.serializers import UserSerializer as BaseUserSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
+from .authentication import cache_user_status
 
 
 
@@ -101,3 +103,19 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
         read_only_fields = ['email']  # Email cannot be changed once set
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """
+    Adds the username and staff flags TokenUserAuthentication builds
+    request.user from. Access tokens created on refresh inherit the claims.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        # The user was just loaded, save the first authenticated request a lookup.
+        cache_user_status(user)
+        return token
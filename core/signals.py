@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user_status
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Deactivation or privilege changes apply to the next request authenticated by token.
+    forget_user_status(instance.pk)
@@ -1,9 +1,12 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest import skip
+from rest_framework_simplejwt.tokens import AccessToken
+from core.authentication import TokenUserAuthentication
 
 User = get_user_model()
 
@@ -249,3 +252,50 @@ class UserAuthenticationTest(TestCase):
         refresh_url = '/api/auth/refresh/'
         response = self.client.post(refresh_url, {'refresh': 'invalid-token'})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TokenUserAuthenticationTest(TestCase):
+    """Test class for authenticating from the token without loading the user"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='tokenuser', email='tokenuser@example.com', password='Token!pass123', is_staff=True
+        )
+        response = self.client.post('/api/auth/login/', {'username': 'tokenuser', 'password': 'Token!pass123'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_request_does_not_load_user(self):
+        with self.assertNumQueries(1): # the collections themselves
+            response = self.client.get('/store/collections/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_token_user_attributes(self):
+        token = AccessToken(self.client._credentials['HTTP_AUTHORIZATION'].split()[1])
+        user = TokenUserAuthentication().get_user(token)
+        with self.assertNumQueries(0):
+            self.assertEqual((user.id, user.username, user.is_staff), (self.user.id, 'tokenuser', True))
+            self.assertTrue(user and user.is_authenticated)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'tokenuser@example.com')
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/store/collections/')
+        # SessionAuthentication comes first and sends no WWW-Authenticate, so DRF answers 403.
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_demoted_user_loses_staff_rights(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post('/store/collections/', {'title': 'Staff Only'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_uses_database_user(self):
+        response = self.client.patch('/api/users/profile/', {'first_name': 'Loaded'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Loaded')
@@ -4,6 +4,8 @@ from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer, UserCreateSerializer
 from django.views.generic import TemplateView
+from store.models import Customer
+from store.customers import remember_customer
 
 
 User = get_user_model()
@@ -15,6 +17,13 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = UserCreateSerializer
 
+    def perform_create(self, serializer):
+        # Create the customer profile up front and cache its id, so order
+        # endpoints never have to get_or_create it.
+        user = serializer.save()
+        customer = Customer.objects.create(user=user)
+        remember_customer(user.id, customer.id)
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """
     Retrieve or update user profile.
@@ -22,6 +31,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
+    requires_db_user = True # get_object() returns request.user itself
 
     def get_object(self):
         return self.request.user
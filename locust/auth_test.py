@@ -1,7 +1,9 @@
+import logging
+
 from locust import HttpUser, task, between
 from random import randint, choice
-from colorama import Fore
-from store.test_tools.tools import custom_logger
+
+logger = logging.getLogger(__name__)
 
 class AuthenticationUser(HttpUser):
     wait_time = between(1, 3)
@@ -15,7 +17,7 @@ class AuthenticationUser(HttpUser):
     @task
     def login(self):
         """Test user login performance"""
-        custom_logger("Attempting login...")
+        logger.info("Attempting login...")
         response = self.client.post(
             "/api/auth/login/",
             json={"username": self.username, "password": self.password},
@@ -25,9 +27,9 @@ class AuthenticationUser(HttpUser):
         if response.status_code == 200:
             result = response.json()
             self.access_token = result["access"]
-            custom_logger(f"Login successful: {self.access_token[:15]}...")
+            logger.info("Login successful: %s...", self.access_token[:15])
         else:
-            custom_logger(f"Login failed: {response.status_code} - {response.text}", color=Fore.RED)
+            logger.error("Login failed: %s - %s", response.status_code, response.text)
     
     @task
     def refresh_token(self):
@@ -53,8 +55,8 @@ class AuthenticationUser(HttpUser):
             )
             
             if refresh_response.status_code == 200:
-                custom_logger("Token refresh successful")
+                logger.info("Token refresh successful")
             else:
-                custom_logger(f"Token refresh failed: {refresh_response.status_code}", color=Fore.RED)
+                logger.error("Token refresh failed: %s", refresh_response.status_code)
         else:
-            custom_logger("Could not get refresh token", color=Fore.RED)
+            logger.error("Could not get refresh token")
@@ -1,8 +1,10 @@
+import logging
+
 from locust import HttpUser, task, between
 from random import randint, choice
-from colorama import Fore
 import uuid
-from store.test_tools.tools import custom_logger
+
+logger = logging.getLogger(__name__)
 
 class CartOperationsUser(HttpUser):
     wait_time = between(1, 3)
@@ -25,7 +27,7 @@ class CartOperationsUser(HttpUser):
         if response.status_code == 200:
             result = response.json()
             self.access_token = result["access"]
-            custom_logger(f"Authentication successful: {self.access_token[:15]}...")
+            logger.info("Authentication successful: %s...", self.access_token[:15])
             
             # Get product IDs
             self._get_product_ids()
@@ -33,7 +35,7 @@ class CartOperationsUser(HttpUser):
             # Create a cart
             self._create_cart()
         else:
-            custom_logger(f"Authentication failed: {response.status_code}", color=Fore.RED)
+            logger.error("Authentication failed: %s", response.status_code)
     
     def get_auth_header(self):
         """Return authorization header with JWT token."""
@@ -54,9 +56,9 @@ class CartOperationsUser(HttpUser):
                 products = products["results"]  # Handle pagination
             
             self.product_ids = [p["id"] for p in products]
-            custom_logger(f"Retrieved {len(self.product_ids)} product IDs")
+            logger.info("Retrieved %s product IDs", len(self.product_ids))
         else:
-            custom_logger("Failed to retrieve products", color=Fore.RED)
+            logger.error("Failed to retrieve products")
             # Fallback to some random IDs
             self.product_ids = list(range(1, 20))
     
@@ -71,15 +73,15 @@ class CartOperationsUser(HttpUser):
         if response.status_code == 201:
             result = response.json()
             self.cart_id = result["uid"]
-            custom_logger(f"Created cart with ID: {self.cart_id}")
+            logger.info("Created cart with ID: %s", self.cart_id)
         else:
-            custom_logger(f"Failed to create cart: {response.status_code} - {response.text}", color=Fore.RED)
+            logger.error("Failed to create cart: %s - %s", response.status_code, response.text)
     
     @task(3)
     def add_to_cart(self):
         """Add an item to the cart."""
         if not self.access_token or not self.cart_id or not self.product_ids:
-            custom_logger("Missing required data for add_to_cart", color=Fore.YELLOW)
+            logger.warning("Missing required data for add_to_cart")
             return
         
         product_id = choice(self.product_ids)
@@ -95,9 +97,9 @@ class CartOperationsUser(HttpUser):
         if response.status_code in [200, 201]:
             result = response.json()
             self.cart_items.append(result["uid"] if "uid" in result else None)
-            custom_logger(f"Added product {product_id} (qty: {quantity}) to cart")
+            logger.info("Added product %s (qty: %s) to cart", product_id, quantity)
         else:
-            custom_logger(f"Failed to add to cart: {response.status_code} - {response.text}", color=Fore.RED)
+            logger.error("Failed to add to cart: %s - %s", response.status_code, response.text)
     
     @task(2)
     def view_cart(self):
@@ -112,9 +114,9 @@ class CartOperationsUser(HttpUser):
         )
         
         if response.status_code == 200:
-            custom_logger(f"Successfully viewed cart {self.cart_id}")
+            logger.info("Successfully viewed cart %s", self.cart_id)
         else:
-            custom_logger(f"Failed to view cart: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to view cart: %s", response.status_code)
     
     @task(1)
     def update_cart_item(self):
@@ -136,9 +138,9 @@ class CartOperationsUser(HttpUser):
         )
         
         if response.status_code == 200:
-            custom_logger(f"Updated cart item quantity to {new_quantity}")
+            logger.info("Updated cart item quantity to %s", new_quantity)
         else:
-            custom_logger(f"Failed to update cart item: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to update cart item: %s", response.status_code)
     
     @task(1)
     def remove_from_cart(self):
@@ -160,6 +162,6 @@ class CartOperationsUser(HttpUser):
         )
         
         if response.status_code in [200, 204]:
-            custom_logger(f"Removed item from cart")
+            logger.info("Removed item from cart")
         else:
-            custom_logger(f"Failed to remove item: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to remove item: %s", response.status_code)
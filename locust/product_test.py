@@ -1,7 +1,9 @@
+import logging
+
 from locust import HttpUser, task, between
 from random import randint, choice
-from colorama import Fore
-from store.test_tools.tools import custom_logger
+
+logger = logging.getLogger(__name__)
 
 
 class ProductBrowsingUser(HttpUser):
@@ -20,19 +22,19 @@ class ProductBrowsingUser(HttpUser):
             "/api/auth/login/",
             json={"username": "postgres", "password": "UIui!@#123"}
         )
-        custom_logger(f"response.status_code: {response.status_code}", Fore.GREEN)
+        logger.info("response.status_code: %s", response.status_code)
         
         if response.status_code == 200:
             result = response.json()
             self.access_token = result["access"]
-            custom_logger(f"Authentication successful: {self.access_token[:15]}...")
+            logger.info("Authentication successful: %s...", self.access_token[:15])
             
             # Get collections for later use
             self._get_collections()
             # Get some product IDs for later use
             self._get_product_ids()
         else:
-            custom_logger(f"Authentication failed: {response.status_code}", color=Fore.RED)
+            logger.error("Authentication failed: %s", response.status_code)
     
     def get_auth_header(self):
         """Return authorization header with JWT token."""
@@ -51,9 +53,9 @@ class ProductBrowsingUser(HttpUser):
         if response.status_code == 200:
             collections = response.json()
             self.collections = [c["id"] for c in collections]
-            custom_logger(f"Retrieved {len(self.collections)} collections")
+            logger.info("Retrieved %s collections", len(self.collections))
         else:
-            custom_logger("Failed to retrieve collections", color=Fore.RED)
+            logger.error("Failed to retrieve collections")
     
     def _get_product_ids(self):
         """Get some product IDs for testing."""
@@ -69,9 +71,9 @@ class ProductBrowsingUser(HttpUser):
                 products = products["results"]  # Handle pagination
             
             self.product_ids = [p["id"] for p in products]
-            custom_logger(f"Retrieved {len(self.product_ids)} product IDs")
+            logger.info("Retrieved %s product IDs", len(self.product_ids))
         else:
-            custom_logger("Failed to retrieve products", color=Fore.RED)
+            logger.error("Failed to retrieve products")
             # Fallback to some random IDs
             self.product_ids = list(range(1, 20))
     
@@ -103,15 +105,15 @@ class ProductBrowsingUser(HttpUser):
         )
         
         if response.status_code == 200:
-            custom_logger(f"Successfully viewed products with params: {params}")
+            logger.info("Successfully viewed products with params: %s", params)
         else:
-            custom_logger(f"Failed to view products: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to view products: %s", response.status_code)
     
     @task(2)
     def view_product_details(self):
         """View details of a specific product."""
         if not self.product_ids:
-            custom_logger("No product IDs available for testing", color=Fore.YELLOW)
+            logger.warning("No product IDs available for testing")
             return
         
         product_id = choice(self.product_ids)
@@ -122,9 +124,9 @@ class ProductBrowsingUser(HttpUser):
         )
         
         if response.status_code == 200:
-            custom_logger(f"Successfully viewed product {product_id}")
+            logger.info("Successfully viewed product %s", product_id)
         else:
-            custom_logger(f"Failed to view product {product_id}: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to view product %s: %s", product_id, response.status_code)
     
     @task(1)
     def view_product_reviews(self):
@@ -140,9 +142,9 @@ class ProductBrowsingUser(HttpUser):
         )
         
         if response.status_code == 200:
-            custom_logger(f"Successfully viewed reviews for product {product_id}")
+            logger.info("Successfully viewed reviews for product %s", product_id)
         else:
-            custom_logger(f"Failed to view reviews: {response.status_code}", color=Fore.RED)
+            logger.error("Failed to view reviews: %s", response.status_code)
     
     @task(1)
     def say_hello(self):
@@ -1,7 +1,5 @@
 from django.shortcuts import render
-from traitlets import All
 from .tasks import notify_customers
-import requests
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
@@ -17,6 +15,8 @@ class HelloView(APIView):
 
     @method_decorator(cache_page(1 * 60))
     def get(self, request):
+        import requests # only this demo view needs it, keep it out of worker boot
+
         try:
             logger.info("Getting data form httpbin... .")
             response = requests.get('https://httpbin.org/delay/2')
@@ -6,6 +6,7 @@ from django.db.models import Count
 from django.utils.html import format_html, urlencode
 from django.urls import reverse
 from .models import *
+from .cache import bump_catalog_version_on_commit
 admin.site.register(Promotion)
 admin.site.register(CartItem)
 
@@ -59,6 +60,7 @@ class ProductAdmin(admin.ModelAdmin):
     @admin.display(description='Clear Inventory.')
     def clear_inventory(self, request, queryset):
         inventory_count = queryset.update(inventory=0)
+        bump_catalog_version_on_commit() # queryset.update() does not send post_save
         self.message_user(
             request,
             f'{inventory_count} products were successfully updated.',
@@ -69,12 +71,12 @@ class ProductAdmin(admin.ModelAdmin):
 
 @admin.register(Collection)
 class CollectionAdmin(admin.ModelAdmin):
-    list_display = ['title', 'product_count'] # second field: to find out how many products we have related to collection.
+    list_display = ['title', 'product_count', 'subtree_products_count'] # second field: to find out how many products we have related to collection.
     list_per_page = 20
     search_fields = ['title']
     autocomplete_fields = ['featured_product']
 
-    @admin.display(ordering='product_count')
+    @admin.display(ordering='products_count')
     def product_count(self, collection):
         # reverse('admin:app_model_page') target page links:
         related_url = reverse('admin:store_product_changelist')\
@@ -82,12 +84,8 @@ class CollectionAdmin(admin.ModelAdmin):
             'collection_id': str(collection.pk)
         })
         # make a value of a field to clickable and ralate to links.
-        return format_html(f'<a href="{related_url}">{collection.product_count}</a>')
-
-    def get_queryset(self, request: HttpRequest) -> QuerySet[Any]:
-        return super().get_queryset(request).annotate(
-            product_count = Count('products')
-        )
+        # products_count is a maintained column (store.counters), no annotation needed.
+        return format_html(f'<a href="{related_url}">{collection.products_count}</a>')
     
 
 @admin.register(Customer)
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class StoreConfig(AppConfig):
@@ -7,3 +8,5 @@ class StoreConfig(AppConfig):
     
     def ready(self):
         import store.signals
+        from store.search import install_after_migrate
+        post_migrate.connect(install_after_migrate, sender=self)
@@ -0,0 +1,127 @@
+"""
+Read-through cache for catalog endpoints.
+
+Cached entries are keyed on a catalog version token stored in the default
+cache. Any change to a Product, ProductImages or Collection bumps the version
+(see store/signals.py), so stale entries are never read again and simply
+expire on their own timeout.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = 'store:catalog:version'
+CATALOG_MODIFIED_KEY = 'store:catalog:modified'
+
+
+def get_catalog_version():
+    """Returns the current catalog version, starting a new one if missing."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # A random token, so an evicted version never revives entries cached
+        # under an earlier one.
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def get_catalog_modified():
+    """Returns when the catalog version was last bumped, or None if unknown."""
+    return cache.get(CATALOG_MODIFIED_KEY)
+
+
+def bump_catalog_version():
+    """Invalidates every cached catalog entry by moving to a new version."""
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    # Last-Modified of catalog responses (see store/conditional.py).
+    cache.set(CATALOG_MODIFIED_KEY, timezone.now(), timeout=None)
+
+
+def bump_catalog_version_on_commit():
+    """Bumps the version once the current transaction commits.
+
+    Bumping before commit would let a concurrent request re-fill the cache
+    with the old rows under the new version.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+def build_catalog_cache_key(prefix, request, params, extra=''):
+    """
+    Builds a cache key for a catalog read.
+
+    Only the query parameters listed in `params` take part in the key, with
+    blank values dropped and the rest sorted, so `?page=2&search=x` and
+    `?search=x&page=2&foo=` share one entry. The host is included because
+    hyperlinked fields render absolute URLs.
+    """
+    query = request.query_params
+    normalized = sorted(
+        (name, value)
+        for name in params
+        for value in query.getlist(name)
+        if value != ''
+    )
+    raw = '|'.join([
+        request.build_absolute_uri('/'),
+        str(extra),
+        '&'.join(f'{name}={value}' for name, value in normalized),
+    ])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'store:catalog:{get_catalog_version()}:{prefix}:{digest}'
+
+
+class CatalogCacheMixin:
+    """
+    Viewset mixin caching the serialized payload of list/retrieve actions.
+
+    Attributes:
+        cache_key_params (list): Query parameters that change the response.
+        cache_timeout (int): Seconds an entry lives, defaults to
+            settings.CATALOG_CACHE_TIMEOUT.
+    """
+    cache_key_params = []
+    cache_timeout = None
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+    def cached_response(self, prefix, extra, compute):
+        """
+        Returns a cached Response for this request or computes and stores one.
+
+        Args:
+            prefix (str): Action name used in the cache key.
+            extra: Additional key material, e.g. the object pk.
+            compute (callable): Builds the Response on a cache miss.
+        """
+        key = build_catalog_cache_key(prefix, self.request, self.cache_key_params, extra)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = compute()
+            if response.status_code != 200:
+                return response
+            cache.set(key, response.data, self.get_cache_timeout())
+        # Lets CompressionMiddleware cache the compressed body next to the payload.
+        response.compression_cache = (key, self.get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            'list', '', lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            'retrieve', kwargs.get(self.lookup_url_kwarg or self.lookup_field),
+            lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs)
+        )
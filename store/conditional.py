@@ -0,0 +1,122 @@
+"""
+Conditional GET (ETag / Last-Modified) for catalog and cart reads.
+
+Validators come from version tokens kept in the cache, so they cost no
+query: catalog responses use the catalog version (see store/cache.py) and
+carts use a per-cart version that the cart item signals bump. When the
+client's If-None-Match or If-Modified-Since matches, a 304 Not Modified is
+returned without touching the database. Otherwise the validators are added
+to the regular response.
+"""
+import hashlib
+import uuid
+from calendar import timegm
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import build_catalog_cache_key, get_catalog_modified
+
+CART_VERSION_KEY = 'store:cart:{}:version'
+
+
+def make_etag(*parts):
+    """Returns a short opaque ETag value for `parts`."""
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def catalog_validators(request, prefix, params, extra=''):
+    """
+    Returns (etag, last_modified) of a catalog read.
+
+    Every product, image and collection change bumps the catalog version,
+    so the cache key of the read doubles as its ETag. Last-Modified is the
+    time of the last bump.
+    """
+    modified = get_catalog_modified()
+    return make_etag(build_catalog_cache_key(prefix, request, params, extra), modified), modified
+
+
+def get_cart_version(cart_id):
+    """Returns the cart's version token, starting a new one if missing."""
+    key = CART_VERSION_KEY.format(cart_id)
+    version = cache.get(key)
+    if version is None:
+        # A random token, so an evicted version never matches an old ETag.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cart_version_on_commit(cart_id):
+    """Changes the cart's version token once the current transaction commits."""
+    transaction.on_commit(
+        lambda: cache.set(CART_VERSION_KEY.format(cart_id), uuid.uuid4().hex, timeout=None)
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin answering conditional list/retrieve requests with 304.
+
+    Must come before mixins overriding list/retrieve (CatalogCacheMixin,
+    FastListMixin), so a 304 skips them as well.
+
+    Attributes:
+        conditional_actions (tuple): Actions that get validators.
+        cache_control (dict): Cache-Control directives for responses with
+            validators. Defaults to no-cache: clients may store the payload
+            but must revalidate it before reuse.
+    """
+    conditional_actions = ('list', 'retrieve')
+    cache_control = {'no_cache': True}
+
+    def get_validators(self):
+        """
+        Returns (etag, last_modified) for the current request.
+
+        Either may be None. Return None instead of the tuple to skip
+        conditional handling, e.g. when the object doesn't exist.
+        """
+        raise NotImplementedError
+
+    def conditional_response(self, compute):
+        """
+        Returns a 304 when the client's copy is current, otherwise compute()'s response.
+
+        Args:
+            compute (callable): Builds the full response.
+        """
+        validators = self.get_validators()
+        if validators is None:
+            return compute()
+
+        etag, last_modified = validators
+        headers = {}
+        if etag is not None:
+            # The same URL renders differently per negotiated format.
+            etag = quote_etag(make_etag(etag, self.request.accepted_renderer.format))
+            headers['ETag'] = etag
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+            headers['Last-Modified'] = http_date(last_modified)
+
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = compute()
+            if response.status_code != 200:
+                return response
+        for name, value in headers.items():
+            response[name] = value
+        patch_cache_control(response, **self.cache_control)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        compute = lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        return self.conditional_response(compute) if 'list' in self.conditional_actions else compute()
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        return self.conditional_response(compute) if 'retrieve' in self.conditional_actions else compute()
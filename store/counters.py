@@ -0,0 +1,102 @@
+"""
+Denormalized product counts on Collection.
+
+Collection.products_count counts the products directly in a collection and
+Collection.subtree_products_count also counts those of its descendants (the
+MPTT roll-up). Both are kept up to date by the Product and Collection signal
+handlers in store/signals.py, so collection listings read plain columns
+instead of grouping the product table.
+
+Writes that bypass signals (bulk_create, queryset.update(collection=...), raw
+SQL) must call adjust_products_count() themselves. Otherwise run the
+reconcile_collection_counts command afterwards.
+"""
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+
+def adjust_products_count(collection_model, collection_id, delta):
+    """
+    Adds delta to a collection's count and to the subtree counts of the collection and its ancestors.
+
+    Args:
+        collection_model (Model): Collection, or its historical model in migrations.
+        collection_id (int): The collection the products were added to or removed from.
+        delta (int): Number of products added (negative when removed).
+    """
+    if not delta:
+        return
+    node = collection_model.objects.filter(pk=collection_id).values('tree_id', 'lft', 'rght').first()
+    if node is None:
+        return
+    collection_model.objects.filter(
+        tree_id=node['tree_id'], lft__lte=node['lft'], rght__gte=node['rght'],
+    ).update(
+        products_count=F('products_count') + Case(
+            When(pk=collection_id, then=Value(delta)), default=Value(0), output_field=IntegerField()
+        ),
+        subtree_products_count=F('subtree_products_count') + delta,
+    )
+
+
+def move_subtree_count(collection_model, old_parent_id, new_parent_id, count):
+    """
+    Moves a re-parented collection's subtree count from its old ancestors to the new ones.
+
+    Must run after the move, so the moved node is no longer inside the old parent's bounds.
+    """
+    for parent_id, delta in [(old_parent_id, -count), (new_parent_id, count)]:
+        if parent_id is None or not count:
+            continue
+        node = collection_model.objects.filter(pk=parent_id).values('tree_id', 'lft', 'rght').first()
+        if node is not None:
+            collection_model.objects.filter(
+                tree_id=node['tree_id'], lft__lte=node['lft'], rght__gte=node['rght'],
+            ).update(subtree_products_count=F('subtree_products_count') + delta)
+
+
+def expected_counts(collection_model, product_model):
+    """
+    Returns collections annotated with the counts computed from the product table.
+
+    Returns:
+        QuerySet: Collections with `expected_count` and `expected_subtree_count`.
+    """
+    direct = product_model.objects.filter(collection=OuterRef('pk')).order_by() \
+        .values('collection').annotate(count=Count('pk')).values('count')
+    subtree = product_model.objects.filter(
+        collection__tree_id=OuterRef('tree_id'),
+        collection__lft__gte=OuterRef('lft'),
+        collection__rght__lte=OuterRef('rght'),
+    ).order_by().values('collection__tree_id').annotate(count=Count('pk')).values('count')
+    return collection_model.objects.annotate(
+        expected_count=Coalesce(Subquery(direct), 0),
+        expected_subtree_count=Coalesce(Subquery(subtree), 0),
+    )
+
+
+def reconcile_products_counts(collection_model, product_model, dry_run=False):
+    """
+    Recomputes the counters of collections whose stored values have drifted.
+
+    Args:
+        collection_model (Model): Collection, or its historical model in migrations.
+        product_model (Model): Product, or its historical model in migrations.
+        dry_run (bool): Only report the drifted collections.
+
+    Returns:
+        list: (id, products_count, expected_count, subtree_products_count,
+            expected_subtree_count) tuples of the drifted collections.
+    """
+    drifted = list(
+        expected_counts(collection_model, product_model)
+        .exclude(products_count=F('expected_count'), subtree_products_count=F('expected_subtree_count'))
+        .order_by('pk')
+        .values_list('pk', 'products_count', 'expected_count', 'subtree_products_count', 'expected_subtree_count')
+    )
+    if drifted and not dry_run:
+        for pk, _, count, _, subtree_count in drifted:
+            collection_model.objects.filter(pk=pk).update(
+                products_count=count, subtree_products_count=subtree_count
+            )
+    return drifted
@@ -0,0 +1,90 @@
+"""
+User -> Customer id resolution.
+
+Order endpoints only need the customer id of the requesting user. Lookups go
+through two tiers before touching the database:
+
+1. a small per-process LRU whose entries expire after LOCAL_TTL seconds,
+   bounding how long another process can see a deleted customer;
+2. the default (Redis) cache, cleared when a Customer is deleted.
+
+Mappings are only cached once the transaction that read or created the
+Customer commits, so a rolled back Customer is never cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Customer
+
+CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_SIZE = 4096
+LOCAL_TTL = 60
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_key(user_id):
+    return f'store:customer:{user_id}'
+
+
+def _local_get(user_id):
+    with _lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return None
+        customer_id, expires = entry
+        if expires < time.monotonic():
+            del _local[user_id]
+            return None
+        _local.move_to_end(user_id)
+        return customer_id
+
+
+def _local_set(user_id, customer_id):
+    with _lock:
+        _local[user_id] = (customer_id, time.monotonic() + LOCAL_TTL)
+        _local.move_to_end(user_id)
+        while len(_local) > LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def _store(user_id, customer_id):
+    _local_set(user_id, customer_id)
+    cache.set(_cache_key(user_id), customer_id, CACHE_TIMEOUT)
+
+
+def remember_customer(user_id, customer_id):
+    """Stores the mapping in both cache tiers once the transaction commits."""
+    transaction.on_commit(partial(_store, user_id, customer_id))
+
+
+def forget_customer(user_id):
+    """Drops the mapping from this process and the shared cache."""
+    with _lock:
+        _local.pop(user_id, None)
+    cache.delete(_cache_key(user_id))
+
+
+def get_customer_id(user_id):
+    """
+    Returns the id of the user's Customer, creating the Customer if needed.
+    """
+    customer_id = _local_get(user_id)
+    if customer_id is not None:
+        return customer_id
+
+    customer_id = cache.get(_cache_key(user_id))
+    if customer_id is not None:
+        _local_set(user_id, customer_id)
+        return customer_id
+
+    customer, created = Customer.objects.only('id').get_or_create(user_id=user_id)
+    remember_customer(user_id, customer.id)
+    return customer.id
+
@@ -75,3 +75,8 @@ class ProductOutOfStockError(APIException):
     status_code = status.HTTP_409_CONFLICT
     default_detail = 'Product is currently out of stock.'
     default_code = 'product_out_of_stock'
+
+class UnsupportedImportFormatError(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = 'Products can only be imported from CSV or NDJSON.'
+    default_code = 'unsupported_import_format'
@@ -0,0 +1,175 @@
+"""
+Streaming CSV and NDJSON exports of products and orders.
+
+Rows are read with `.values().iterator(chunk_size=...)`, which uses a
+server-side cursor on PostgreSQL. Related rows (product images, order
+items) are fetched with one query per chunk. StreamingHttpResponse writes
+each chunk out before the next one is read, so memory use doesn't grow with
+the table.
+"""
+import csv
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+from .fastpath import ProductRowSerializer
+from .models import OrderItem
+from .serializer import OrderItemSerializer
+
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+class Echo:
+    """File-like object handing csv.writer's output straight back."""
+
+    def write(self, value):
+        return value
+
+
+class Export:
+    """
+    Base class for the exports.
+
+    Args:
+        request (Request): Used to build absolute URLs.
+        queryset (QuerySet): Filtered and ordered rows to export.
+        chunk_size (int): Rows per fetch, defaults to settings.EXPORT_CHUNK_SIZE.
+
+    Attributes:
+        columns (list): Fields passed to `.values()`.
+        csv_header (list): CSV column names, matching csv_rows().
+        filename (str): Download name, without the extension.
+    """
+    columns = []
+    csv_header = []
+    filename = 'export'
+
+    def __init__(self, request, queryset, chunk_size=None):
+        self.request = request
+        self.queryset = queryset
+        self.chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        self.datetime = serializers.DateTimeField().to_representation
+
+    def chunks(self):
+        rows = self.queryset.prefetch_related(None).values(*self.columns).iterator(chunk_size=self.chunk_size)
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield self.records(chunk)
+
+    def records(self, rows):
+        """Returns the export records (dicts) for a chunk of `.values()` rows."""
+        raise NotImplementedError
+
+    def csv_rows(self, record):
+        """Yields the CSV lines of a record."""
+        raise NotImplementedError
+
+    def ndjson(self):
+        encoder = JSONEncoder(ensure_ascii=False)
+        for records in self.chunks():
+            yield ''.join(encoder.encode(record) + '\n' for record in records)
+
+    def csv(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.csv_header)
+        for records in self.chunks():
+            yield ''.join(writer.writerow(line) for record in records for line in self.csv_rows(record))
+
+    def response(self, fmt):
+        """
+        Returns a StreamingHttpResponse with the export as an attachment.
+
+        Args:
+            fmt (str): 'csv' or 'ndjson'.
+        """
+        response = StreamingHttpResponse(getattr(self, fmt)(), content_type=f'{CONTENT_TYPES[fmt]}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}.{fmt}"'
+        return response
+
+
+class ProductExport(Export):
+    """Products with their collection title and image URLs."""
+    columns = [
+        'id', 'title', 'slug', 'description', 'unit_price', 'inventory',
+        'last_update', 'collection_id', 'collection__title',
+    ]
+    csv_header = [
+        'id', 'title', 'slug', 'description', 'unit_price', 'inventory',
+        'last_update', 'collection_id', 'collection_title', 'images',
+    ]
+    filename = 'products'
+
+    def __init__(self, request, queryset, chunk_size=None):
+        super().__init__(request, queryset, chunk_size)
+        self.images = ProductRowSerializer(request).get_images
+
+    def records(self, rows):
+        images = self.images([row['id'] for row in rows])
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'slug': row['slug'],
+                'description': row['description'],
+                'unit_price': row['unit_price'],
+                'inventory': row['inventory'],
+                'last_update': self.datetime(row['last_update']),
+                'collection_id': row['collection_id'],
+                'collection_title': row['collection__title'],
+                'images': [image['image'] for image in images.get(row['id'], [])],
+            }
+            for row in rows
+        ]
+
+    def csv_rows(self, record):
+        yield [record[column] for column in self.csv_header[:-1]] + [' '.join(record['images'])]
+
+
+class OrderExport(Export):
+    """Orders with their items; the CSV has one line per item."""
+    columns = ['id', 'placed_at', 'payment_status', 'customer_id']
+    csv_header = [
+        'id', 'placed_at', 'payment_status', 'customer_id',
+        'product_id', 'product_title', 'quantity', 'unit_price',
+    ]
+    filename = 'orders'
+
+    def __init__(self, request, queryset, chunk_size=None):
+        super().__init__(request, queryset, chunk_size)
+        self.unit_price = OrderItemSerializer().fields['unit_price'].to_representation
+
+    def get_items(self, order_ids):
+        items = {}
+        rows = OrderItem.objects.filter(order_id__in=order_ids).order_by('pk').values_list(
+            'order_id', 'product_id', 'product__title', 'quantity', 'unit_price'
+        )
+        for order_id, product_id, title, quantity, unit_price in rows:
+            items.setdefault(order_id, []).append({
+                'product_id': product_id,
+                'product_title': title,
+                'quantity': quantity,
+                'unit_price': self.unit_price(unit_price),
+            })
+        return items
+
+    def records(self, rows):
+        items = self.get_items([row['id'] for row in rows])
+        return [
+            {
+                'id': row['id'],
+                'placed_at': self.datetime(row['placed_at']),
+                'payment_status': row['payment_status'],
+                'customer_id': row['customer_id'],
+                'items': items.get(row['id'], []),
+            }
+            for row in rows
+        ]
+
+    def csv_rows(self, record):
+        order = [record['id'], record['placed_at'], record['payment_status'], record['customer_id']]
+        if not record['items']:
+            yield order + [''] * 4
+        for item in record['items']:
+            yield order + list(item.values())
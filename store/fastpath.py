@@ -0,0 +1,179 @@
+"""
+Serializer-free list rendering.
+
+List actions of the product, collection and order viewsets build their
+payload straight from `.values()` rows instead of running every row through
+ModelSerializer field by field. Hyperlinks are reversed once per request and
+filled in per row, and related rows (product images, order items) are fetched
+with one extra `.values()` query.
+
+Each row serializer must produce exactly what the matching ModelSerializer
+would (same keys, order and values); store.tests.FastListParityTests holds
+them to that. Set settings.FAST_LIST_SERIALIZATION = False to fall back to
+the serializers.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from .models import OrderItem, ProductImages
+from .serializer import OrderItemSerializer, OrderListSerializer
+
+PK_PLACEHOLDER = '__pk__'
+
+
+def url_template(view_name, request):
+    """
+    Reverses `view_name` once and returns a function filling in the pk.
+
+    Args:
+        view_name (str): Detail route name, e.g. 'collection-detail'.
+        request (Request): Used to build absolute URLs like the serializers do.
+    """
+    prefix, suffix = reverse(view_name, kwargs={'pk': PK_PLACEHOLDER}, request=request).split(PK_PLACEHOLDER)
+    return lambda pk: f'{prefix}{pk}{suffix}'
+
+
+class RowSerializer:
+    """
+    Base class for the row serializers.
+
+    Attributes:
+        columns (list): Fields passed to `.values()`. Must include every
+            field the list can be ordered (or keyset paginated) by.
+    """
+    columns = []
+
+    def __init__(self, request):
+        self.request = request
+
+    def get_rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def to_representation(self, rows):
+        raise NotImplementedError
+
+
+class ProductRowSerializer(RowSerializer):
+    """Mirrors ProductSerializer."""
+    columns = [
+        'id', 'slug', 'title', 'description', 'unit_price', 'inventory',
+        'last_update', 'collection_id', 'collection__title',
+    ]
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.collection_url = url_template('collection-detail', request)
+        self.storage = ProductImages._meta.get_field('image').storage
+
+    def get_images(self, product_ids):
+        images = defaultdict(list)
+        rows = ProductImages.objects.filter(product_id__in=product_ids).order_by('pk') \
+            .values_list('product_id', 'pk', 'image')
+        for product_id, pk, name in rows:
+            images[product_id].append({
+                'pk': pk,
+                'image': self.request.build_absolute_uri(self.storage.url(name)) if name else None,
+            })
+        return images
+
+    def to_representation(self, rows):
+        images = self.get_images([row['id'] for row in rows]) if rows else {}
+        return [
+            {
+                'id': row['id'],
+                'slug': row['slug'],
+                'title': row['title'],
+                'description': row['description'],
+                'unit_price': row['unit_price'],
+                'inventory': row['inventory'],
+                'price_with_tax': row['unit_price'] * Decimal(1.09),
+                'collection': self.collection_url(row['collection_id']),
+                'images': images.get(row['id'], []),
+                'collection_title': row['collection__title'],
+            }
+            for row in rows
+        ]
+
+
+class CollectionRowSerializer(RowSerializer):
+    """Mirrors CollectionSerializer."""
+    columns = ['id', 'title', 'products_count']
+
+    def to_representation(self, rows):
+        products_url = reverse('products-list', request=self.request)
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'products_count': row['products_count'],
+                'products_link': f"{products_url}?collection_id={row['id']}",
+            }
+            for row in rows
+        ]
+
+
+class OrderRowSerializer(RowSerializer):
+    """Mirrors OrderListSerializer."""
+    columns = ['id', 'placed_at', 'payment_status', 'customer_id']
+
+    def __init__(self, request):
+        super().__init__(request)
+        # Reuse the serializers' own fields for the timezone and decimal formatting.
+        self.placed_at = OrderListSerializer().fields['placed_at'].to_representation
+        self.unit_price = OrderItemSerializer().fields['unit_price'].to_representation
+
+    def get_items(self, order_ids):
+        items = defaultdict(list)
+        rows = OrderItem.objects.filter(order_id__in=order_ids).order_by('pk').values_list(
+            'order_id', 'id', 'product_id', 'product__title', 'product__unit_price', 'unit_price', 'quantity'
+        )
+        for order_id, pk, product_id, title, product_price, unit_price, quantity in rows:
+            items[order_id].append({
+                'id': pk,
+                'product': {'id': product_id, 'title': title, 'unit_price': product_price},
+                'unit_price': self.unit_price(unit_price),
+                'quantity': quantity,
+            })
+        return items
+
+    def to_representation(self, rows):
+        items = self.get_items([row['id'] for row in rows]) if rows else {}
+        return [
+            {
+                'id': row['id'],
+                'placed_at': self.placed_at(row['placed_at']),
+                'payment_status': row['payment_status'],
+                'customer': row['customer_id'],
+                'items': items.get(row['id'], []),
+            }
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """
+    Viewset mixin serving `list` through a RowSerializer.
+
+    Attributes:
+        row_serializer_class (type): RowSerializer subclass matching the
+            viewset's list serializer.
+    """
+    row_serializer_class = None
+
+    def use_fast_list(self):
+        return self.row_serializer_class is not None and getattr(settings, 'FAST_LIST_SERIALIZATION', True)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        row_serializer = self.row_serializer_class(request)
+        rows = row_serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.to_representation(list(page)))
+        return Response(row_serializer.to_representation(list(rows)))
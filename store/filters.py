@@ -1,11 +1,15 @@
-from django_filters import FilterSet
-from .models import Product, Collection
+from django.db.models import Subquery
+from django_filters import FilterSet, NumberFilter
+from .models import Product, Collection, Order
 """
 for more information:
     https://django-filter.readthedocs.io/en/stable/
 learn : generic filters.
 """
 class ProductFilter(FilterSet):
+    collection_subtree = NumberFilter(
+        method='filter_collection_subtree', label='Collection, including its sub-collections')
+
     class Meta:
         model = Product
         fields = {
@@ -13,6 +17,22 @@ class ProductFilter(FilterSet):
             'unit_price': ['gt', 'lt']
         }
 
+    def filter_collection_subtree(self, queryset, name, value):
+        """
+        Keeps products of a collection and of all its descendants.
+
+        The subtree is the collection's MPTT range: same tree_id with lft/rght
+        inside its bounds (collection_subtree_idx). The bounds are read with
+        scalar subqueries, so this stays one statement without recursion.
+        """
+        node = Collection.objects.filter(pk=value)
+        subtree = Collection.objects.filter(
+            tree_id=Subquery(node.values('tree_id')),
+            lft__gte=Subquery(node.values('lft')),
+            rght__lte=Subquery(node.values('rght')),
+        )
+        return queryset.filter(collection__in=subtree.values('pk'))
+
 
 class CollectionFilter(FilterSet):
     class Meta:
@@ -20,4 +40,22 @@ class CollectionFilter(FilterSet):
         fields = {
             'title': ['exact'],
             'featured_product': ['exact']
-        }
\ No newline at end of file
+        }
+
+class ProductExportFilter(ProductFilter):
+    class Meta:
+        model = Product
+        fields = {
+            'collection_id': ['exact'],
+            'unit_price': ['gt', 'lt'],
+            'last_update': ['gte', 'lt'],
+        }
+
+
+class OrderExportFilter(FilterSet):
+    class Meta:
+        model = Order
+        fields = {
+            'payment_status': ['exact'],
+            'placed_at': ['gte', 'lt'],
+        }
@@ -0,0 +1,252 @@
+"""
+Bulk product import from CSV or NDJSON.
+
+Input is read line by line and never held in memory as a whole. Valid rows
+are collected into batches, and every batch is written in one transaction:
+
+    staging table  <- COPY (PostgreSQL) or executemany (other backends)
+    store_product  <- INSERT ... SELECT FROM staging ON CONFLICT (title) DO UPDATE
+
+Collections are resolved through a title -> id map loaded once per import.
+Nothing goes through Model.save(), so the collection counters are adjusted
+per batch (see store.counters) and the catalog cache is bumped on commit.
+
+Columns: title, slug (optional, derived from the title), description
+(optional), unit_price, inventory, and either collection (a title) or
+collection_id.
+"""
+import codecs
+import csv
+import io
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .cache import bump_catalog_version_on_commit
+from .counters import adjust_products_count
+from .exceptions import UnsupportedImportFormatError
+from .models import Collection, Product
+
+FORMATS = {
+    'csv': 'csv',
+    'text/csv': 'csv',
+    'ndjson': 'ndjson',
+    'jsonl': 'ndjson',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+STAGING_TABLE = 'store_product_import'
+COLUMNS = ['title', 'slug', 'description', 'unit_price', 'inventory', 'collection_id']
+# Rows kept in the report; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(name):
+    """
+    Returns 'csv' or 'ndjson' for a content type, file name or format name.
+
+    Raises:
+        UnsupportedImportFormatError: For anything else.
+    """
+    name = (name or '').split(';')[0].strip().lower()
+    fmt = FORMATS.get(name) or FORMATS.get(name.rsplit('.', 1)[-1])
+    if fmt is None:
+        raise UnsupportedImportFormatError()
+    return fmt
+
+
+def read_rows(lines, fmt):
+    """
+    Parses an iterable of byte lines (a file, an upload, the request body).
+
+    Yields:
+        tuple: (line number, row dict or None, error message or None).
+    """
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f'Invalid JSON: {exc}'
+            continue
+        if isinstance(row, dict):
+            yield number, row, None
+        else:
+            yield number, None, 'Expected a JSON object.'
+
+
+class ProductImporter:
+    """
+    Validates product rows and upserts them on title in batches.
+
+    Args:
+        batch_size (int): Rows per staging/upsert transaction, defaults to
+            settings.PRODUCT_IMPORT_BATCH_SIZE.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'PRODUCT_IMPORT_BATCH_SIZE', 5000)
+        self.collections = dict(Collection.objects.values_list('title', 'id'))
+        self.collection_ids = set(self.collections.values())
+        self.max_length = {
+            field: Product._meta.get_field(field).max_length for field in ('title', 'slug')
+        }
+        self.report = {'created': 0, 'updated': 0, 'invalid': 0, 'errors': []}
+
+    def run(self, rows):
+        """
+        Imports the rows yielded by read_rows().
+
+        Returns:
+            dict: created, updated and invalid counts, plus up to
+                MAX_REPORTED_ERRORS {'line', 'error'} entries.
+        """
+        batch = {}
+        try:
+            for number, row, error in rows:
+                if error is None:
+                    try:
+                        cleaned = self.clean(row)
+                    except ValueError as exc:
+                        error = str(exc)
+                if error is not None:
+                    self.add_error(number, error)
+                    continue
+                # One upsert can't touch the same row twice: the last row for a title wins.
+                batch[cleaned[0]] = cleaned
+                if len(batch) >= self.batch_size:
+                    self.write(list(batch.values()))
+                    batch = {}
+            if batch:
+                self.write(list(batch.values()))
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {STAGING_TABLE}')
+        return self.report
+
+    def add_error(self, number, error):
+        self.report['invalid'] += 1
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'line': number, 'error': error})
+
+    def clean(self, row):
+        """
+        Returns the row as a tuple in COLUMNS order.
+
+        Raises:
+            ValueError: With a message for the report when the row is invalid.
+        """
+        title = str(row.get('title') or '').strip()
+        if not title:
+            raise ValueError('title is required.')
+        if len(title) > self.max_length['title']:
+            raise ValueError(f"title is longer than {self.max_length['title']} characters.")
+        slug = str(row.get('slug') or '').strip() or slugify(title)[:self.max_length['slug']]
+        if len(slug) > self.max_length['slug']:
+            raise ValueError(f"slug is longer than {self.max_length['slug']} characters.")
+        description = row.get('description') or None
+        return (
+            title,
+            slug,
+            description,
+            self.whole_number(row, 'unit_price', 2 ** 63 - 1),
+            self.whole_number(row, 'inventory', 2 ** 31 - 1),
+            self.resolve_collection(row),
+        )
+
+    def whole_number(self, row, field, maximum):
+        value = row.get(field)
+        try:
+            number = int(str(value).strip())
+        except ValueError:
+            raise ValueError(f'{field} must be a whole number, got {value!r}.')
+        if not 0 <= number <= maximum:
+            raise ValueError(f'{field} must be between 0 and {maximum}.')
+        return number
+
+    def resolve_collection(self, row):
+        collection_id = row.get('collection_id')
+        if collection_id not in (None, ''):
+            try:
+                collection_id = int(str(collection_id).strip())
+            except ValueError:
+                collection_id = None
+            if collection_id not in self.collection_ids:
+                raise ValueError(f"Unknown collection_id {row.get('collection_id')!r}.")
+            return collection_id
+        title = str(row.get('collection') or '').strip()
+        if title not in self.collections:
+            raise ValueError(f'Unknown collection {title!r}.')
+        return self.collections[title]
+
+    def write(self, batch):
+        table = Product._meta.db_table
+        columns = ', '.join(COLUMNS)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:] + ['last_update'])
+        now = Product._meta.get_field('last_update').get_db_prep_value(timezone.now(), connection)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                self.stage(cursor, batch)
+                # Products about to move or be overwritten, to keep the collection counters right.
+                cursor.execute(f"""
+                    SELECT p.collection_id, count(*) FROM {table} p
+                    JOIN {STAGING_TABLE} s ON s.title = p.title
+                    GROUP BY p.collection_id
+                """)
+                replaced = Counter(dict(cursor.fetchall()))
+                # WHERE true: SQLite can't otherwise tell ON CONFLICT from a join constraint.
+                cursor.execute(f"""
+                    INSERT INTO {table} ({columns}, last_update)
+                    SELECT {columns}, %s FROM {STAGING_TABLE} WHERE true
+                    ON CONFLICT (title) DO UPDATE SET {updates}
+                """, [now])
+
+            counts = Counter(row[-1] for row in batch)
+            counts.subtract(replaced)
+            for collection_id, delta in counts.items():
+                adjust_products_count(Collection, collection_id, delta)
+            bump_catalog_version_on_commit()
+
+        updated = sum(replaced.values())
+        self.report['updated'] += updated
+        self.report['created'] += len(batch) - updated
+
+    def stage(self, cursor, batch):
+        columns = ', '.join(COLUMNS)
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+                title varchar(255) NOT NULL, slug varchar(50), description text,
+                unit_price bigint NOT NULL, inventory integer NOT NULL, collection_id bigint NOT NULL
+            )
+        """)
+        cursor.execute(f'DELETE FROM {STAGING_TABLE}')
+        if connection.vendor != 'postgresql':
+            placeholders = ', '.join(['%s'] * len(COLUMNS))
+            cursor.executemany(f'INSERT INTO {STAGING_TABLE} ({columns}) VALUES ({placeholders})', batch)
+            return
+
+        copy_sql = f'COPY {STAGING_TABLE} ({columns}) FROM STDIN'
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'): # psycopg 3
+            with raw.copy(copy_sql) as copy:
+                for row in batch:
+                    copy.write_row(row)
+        else: # psycopg2
+            buffer = io.StringIO()
+            # In CSV format an unquoted empty field is NULL, which is how None is written.
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            raw.copy_expert(f'{copy_sql} WITH (FORMAT csv)', buffer)
@@ -0,0 +1,218 @@
+"""
+Set-based inventory operations on store_product.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version_on_commit
+from .exceptions import InsufficientStockError
+from .models import Product
+
+
+def _values_sql(rows, casts):
+    """Returns a VALUES list for `rows` and its params, casting columns where given."""
+    placeholders = ', '.join(f'%s::{cast}' if cast else '%s' for cast in casts)
+    sql = ', '.join(f'({placeholders})' for _ in rows)
+    params = [value for row in rows for value in row]
+    return sql, params
+
+
+def reserve_inventory(quantities):
+    """
+    Atomically decrements inventory for every product in `quantities`.
+
+    All products are updated with one conditional statement,
+    `SET inventory = inventory - q ... WHERE inventory >= q`, joined against
+    a VALUES list of (id, q). If any product lacks stock the whole
+    reservation fails. Must run inside transaction.atomic(), which rolls
+    back the rows that were already decremented.
+
+    On PostgreSQL the rows are locked in id order first, so concurrent
+    checkouts sharing products queue up instead of deadlocking. Call this
+    as late as possible in the transaction to keep hot rows locked briefly.
+
+    Args:
+        quantities (dict | Iterable[tuple]): product id -> quantity to reserve.
+
+    Raises:
+        InsufficientStockError: If a product is missing or lacks stock.
+    """
+    totals = Counter()
+    for product_id, quantity in (quantities.items() if isinstance(quantities, dict) else quantities):
+        totals[int(product_id)] += int(quantity)
+    if not totals:
+        return
+
+    rows = sorted(totals.items())
+    table = Product._meta.db_table
+    if connection.vendor == 'postgresql':
+        values, params = _values_sql(rows, casts=('bigint', 'integer'))
+        sql = f"""
+            WITH requested(id, quantity) AS (VALUES {values}),
+            locked AS (
+                SELECT p.id FROM {table} p JOIN requested r ON r.id = p.id
+                ORDER BY p.id FOR UPDATE OF p
+            )
+            UPDATE {table} p SET inventory = p.inventory - r.quantity
+            FROM requested r, locked l
+            WHERE p.id = r.id AND l.id = r.id AND p.inventory >= r.quantity
+            RETURNING p.id
+        """
+    else:
+        values, params = _values_sql(rows, casts=('', ''))
+        sql = f"""
+            WITH requested(id, quantity) AS (VALUES {values})
+            UPDATE {table} SET inventory = inventory - requested.quantity
+            FROM requested
+            WHERE {table}.id = requested.id AND {table}.inventory >= requested.quantity
+            RETURNING {table}.id
+        """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        reserved = {row[0] for row in cursor.fetchall()}
+
+    missing = sorted(set(totals) - reserved)
+    if missing:
+        raise InsufficientStockError(
+            f"Insufficient stock for product(s): {', '.join(str(pk) for pk in missing)}."
+        )
+    # Inventory is part of the cached product payloads.
+    bump_catalog_version_on_commit()
+
+
+# Products per UPDATE in bulk_update_stock(), 4 parameters each.
+BULK_UPDATE_CHUNK_SIZE = 1000
+MAX_INVENTORY = 2 ** 31 - 1
+MAX_UNIT_PRICE = 2 ** 63 - 1
+
+
+def _whole_number(entry, field, minimum, maximum, negative_error=None):
+    value = entry.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f'{field} must be an integer.')
+    if value < 0 and negative_error:
+        raise ValueError(negative_error)
+    if not minimum <= value <= maximum:
+        raise ValueError(f'{field} must be between {minimum} and {maximum}.')
+    return value
+
+
+def _clean_stock_entry(entry, seen):
+    """
+    Validates one bulk_update_stock() entry.
+
+    Returns:
+        tuple: (id, inventory, inventory_delta, unit_price) with None for
+            values that are left unchanged.
+
+    Raises:
+        ValueError: With the message reported for the entry.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError('Expected an object.')
+    product_id = _whole_number(entry, 'id', 1, MAX_UNIT_PRICE)
+    if product_id is None:
+        raise ValueError('id is required.')
+    # Same messages as ProductViewset.update.
+    inventory = _whole_number(entry, 'inventory', 0, MAX_INVENTORY, 'Inventory can not be negative.')
+    inventory_delta = _whole_number(entry, 'inventory_delta', -MAX_INVENTORY, MAX_INVENTORY)
+    unit_price = _whole_number(entry, 'unit_price', 0, MAX_UNIT_PRICE, 'Unit price can not be negative.')
+    if inventory is not None and inventory_delta is not None:
+        raise ValueError('Give either inventory or inventory_delta, not both.')
+    if inventory is None and inventory_delta is None and unit_price is None:
+        raise ValueError('Nothing to update: give inventory, inventory_delta or unit_price.')
+    if product_id in seen:
+        raise ValueError('Duplicate id.')
+    return product_id, inventory, inventory_delta, unit_price
+
+
+def bulk_update_stock(entries, chunk_size=BULK_UPDATE_CHUNK_SIZE):
+    """
+    Sets or adjusts inventory and sets unit_price for many products at once.
+
+    Each entry is {id, inventory | inventory_delta, unit_price}, where any
+    of the three values may be left out. Entries are validated up front, and
+    then every chunk of valid ones is applied with one statement:
+
+        WITH changes(id, inventory, inventory_delta, unit_price) AS (VALUES ...)
+        UPDATE store_product SET ... FROM changes WHERE <result is in range>
+        RETURNING id, inventory, unit_price
+
+    A delta that would take inventory below zero or past the integer column
+    leaves that product untouched and is reported, like ProductViewset.update
+    reports negative values. The other products are still updated.
+
+    Args:
+        entries (list): The requested changes.
+        chunk_size (int): Products per UPDATE statement.
+
+    Returns:
+        list: One result per entry, in order: {'id', 'status': 'updated',
+            'inventory', 'unit_price'} or {'id', 'status': 'error', 'error'}.
+    """
+    results = [None] * len(entries)
+    valid = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        try:
+            row = _clean_stock_entry(entry, seen)
+        except ValueError as exc:
+            product_id = entry.get('id') if isinstance(entry, dict) else None
+            results[index] = {'id': product_id, 'status': 'error', 'error': str(exc)}
+            continue
+        seen.add(row[0])
+        valid.append((index, row))
+
+    table = Product._meta.db_table
+    now = Product._meta.get_field('last_update').get_db_prep_value(timezone.now(), connection)
+    if connection.vendor == 'postgresql':
+        casts, returning = ('bigint', 'integer', 'integer', 'bigint'), 'p.id, p.inventory, p.unit_price'
+        # In bigint, so a large delta is out of range instead of an "integer out of range" error.
+        current = 'p.inventory::bigint'
+    else:
+        # SQLite only accepts the bare column names in RETURNING.
+        casts, returning = ('', '', '', ''), 'id, inventory, unit_price'
+        current = 'p.inventory'
+    new_inventory = f'coalesce(c.inventory, {current} + coalesce(c.inventory_delta, 0))'
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        values, params = _values_sql([row for _, row in chunk], casts=casts)
+        sql = f"""
+            WITH changes(id, inventory, inventory_delta, unit_price) AS (VALUES {values})
+            UPDATE {table} AS p SET
+                inventory = {new_inventory},
+                unit_price = coalesce(c.unit_price, p.unit_price),
+                last_update = %s
+            FROM changes c
+            WHERE p.id = c.id AND {new_inventory} BETWEEN 0 AND {MAX_INVENTORY}
+            RETURNING {returning}
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params + [now])
+            updated = {row[0]: row for row in cursor.fetchall()}
+
+        missing = [row[0] for _, row in chunk if row[0] not in updated]
+        existing = dict(Product.objects.filter(pk__in=missing).values_list('pk', 'inventory')) if missing else {}
+        for index, row in chunk:
+            product_id = row[0]
+            if product_id in updated:
+                _, inventory, unit_price = updated[product_id]
+                results[index] = {'id': product_id, 'status': 'updated', 'inventory': inventory, 'unit_price': unit_price}
+            elif product_id in existing:
+                # Only a delta can go out of range, inventory itself is validated up front.
+                too_large = existing[product_id] + (row[2] or 0) > MAX_INVENTORY
+                error = 'Inventory is too large.' if too_large else 'Inventory can not be negative.'
+                results[index] = {'id': product_id, 'status': 'error', 'error': error}
+            else:
+                results[index] = {'id': product_id, 'status': 'error', 'error': 'Product not found.'}
+
+    if valid:
+        # Inventory and prices are part of the cached product payloads.
+        bump_catalog_version_on_commit()
+    return results
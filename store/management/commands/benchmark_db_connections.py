@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the database part of a request with a fresh connection per request '
+        'against the configured DB_POOL_MODE (persistent connections or a pool)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Simulated requests per run')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        count = options['requests']
+        connection = connections[alias]
+
+        # Same database, but no pool and no reuse: what every request paid before.
+        options_dict = {k: v for k, v in connection.settings_dict['OPTIONS'].items() if k != 'pool'}
+        fresh = connection.__class__(
+            {**connection.settings_dict, 'CONN_MAX_AGE': 0, 'OPTIONS': options_dict}, alias='benchmark'
+        )
+
+        def per_request_connection():
+            fresh.connect()
+            with fresh.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            fresh.close()
+
+        def configured():
+            # request_started/finished are where Django closes obsolete
+            # connections (or returns them to the pool).
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            request_finished.send(sender=self.__class__)
+
+        mode = connection.settings_dict['OPTIONS'].get('pool') and 'pool' \
+            or f"CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}"
+        for label, run in [('new connection per request', per_request_connection), (f'configured ({mode})', configured)]:
+            timings = []
+            for _ in range(count):
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{label:<40} p50 {statistics.median(timings):8.3f} ms   '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:8.3f} ms'
+            )
+        connection.close()
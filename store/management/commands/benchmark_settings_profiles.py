@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter per profile, so startup is measured cold.
+PROBE = """
+import json, os, statistics, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+startup = time.perf_counter() - start
+
+client = Client(HTTP_ACCEPT='application/json')
+path, count = sys.argv[1], int(sys.argv[2])
+client.get(path)
+timings = []
+for _ in range(count):
+    t = time.perf_counter()
+    client.get(path)
+    timings.append((time.perf_counter() - t) * 1000)
+print(json.dumps({'startup': startup * 1000, 'p50': statistics.median(timings),
+                  'mean': statistics.fmean(timings)}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares startup time and per-request overhead (middleware, URL resolving, '
+        'rendering) of settings profiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+',
+            default=['storefront.settings.dev', 'storefront.settings.prod'],
+            help='Settings modules to compare',
+        )
+        parser.add_argument('--path', default='/store/', help='Path requested, should not hit the database')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            env = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': profile,
+                'ALLOWED_HOSTS': 'testserver',
+                'SILK': os.environ.get('SILK', 'False'),
+            }
+            result = subprocess.run(
+                [sys.executable, '-c', PROBE, options['path'], str(options['requests'])],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                self.stderr.write(f'{profile} failed:\n{result.stderr}')
+                continue
+            timings = json.loads(result.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{profile:<32} startup {timings['startup']:8.1f} ms   "
+                f"request p50 {timings['p50']:7.3f} ms   mean {timings['mean']:7.3f} ms"
+            )
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving its first request.
+BOOT = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({'boot_ms': (time.perf_counter() - start) * 1000}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parses `python -X importtime` output.
+
+    Returns:
+        list: (module, self_us, cumulative_us) tuples, in import order.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue # the header line
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports the slowest imports of django.setup() plus the URLConf, and fails '
+        'when booting takes longer than --budget-ms'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Number of modules to list')
+        parser.add_argument(
+            '--budget-ms', type=float, default=getattr(settings, 'IMPORT_TIME_BUDGET_MS', None),
+            help='Fail when boot time exceeds this many milliseconds (for CI)',
+        )
+        parser.add_argument('--runs', type=int, default=3, help='Boot time is the best of this many runs')
+
+    def run_boot(self, *flags):
+        result = subprocess.run(
+            [sys.executable, *flags, '-c', BOOT],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Booting Django failed:\n{result.stderr}')
+        return result
+
+    def handle(self, *args, **options):
+        modules = parse_importtime(self.run_boot('-X', 'importtime').stderr)
+        top_level = {}
+        for name, self_us, cumulative_us in modules:
+            package = name.lstrip().split('.')[0]
+            top_level[package] = top_level.get(package, 0) + self_us
+
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, self_us, cumulative_us in sorted(modules, key=lambda m: -m[2])[:options['top']]:
+            self.stdout.write(f'{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name.strip()}')
+        self.stdout.write(f"\n{'self ms':>14}  top-level package")
+        for package, self_us in sorted(top_level.items(), key=lambda p: -p[1])[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:14.1f}  {package}')
+
+        # -X importtime itself slows imports down, time the boot without it.
+        boot_ms = min(
+            json.loads(self.run_boot().stdout.strip().splitlines()[-1])['boot_ms']
+            for _ in range(max(options['runs'], 1))
+        )
+        self.stdout.write(f'\ndjango.setup() + URLConf: {boot_ms:.1f} ms')
+        budget = options['budget_ms']
+        if budget is not None and boot_ms > budget:
+            raise CommandError(f'Boot took {boot_ms:.1f} ms, over the {budget:.1f} ms budget.')
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.exceptions import UnsupportedImportFormatError
+from store.importer import ProductImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Streams products from a CSV or NDJSON file and upserts them on title in batches '
+        '(COPY into a staging table on PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (PRODUCT_IMPORT_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            fmt = options['format'] or detect_format(path)
+        except UnsupportedImportFormatError:
+            raise CommandError('Pass --format csv or --format ndjson.')
+
+        importer = ProductImporter(batch_size=options['batch_size'])
+        if path == '-':
+            report = importer.run(read_rows(sys.stdin.buffer, fmt))
+        else:
+            try:
+                with open(path, 'rb') as file:
+                    report = importer.run(read_rows(file, fmt))
+            except FileNotFoundError:
+                raise CommandError(f'{path} does not exist.')
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']}, updated {report['updated']}, "
+            f"skipped {report['invalid']} invalid products."
+        ))
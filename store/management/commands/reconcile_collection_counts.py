@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.cache import bump_catalog_version_on_commit
+from store.counters import reconcile_products_counts
+from store.models import Collection, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes Collection.products_count and subtree_products_count from the product '
+        'table, e.g. after bulk writes or loaddata that bypassed the counter signals'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drifted collections')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = reconcile_products_counts(Collection, Product, dry_run=options['dry_run'])
+            if drifted and not options['dry_run']:
+                bump_catalog_version_on_commit() # queryset.update() does not send post_save
+
+        for pk, count, expected, subtree_count, expected_subtree in drifted:
+            self.stdout.write(
+                f'collection {pk}: products_count {count} -> {expected}, '
+                f'subtree_products_count {subtree_count} -> {expected_subtree}'
+            )
+        action = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{action} {len(drifted)} drifted collections.'))
@@ -0,0 +1,153 @@
+import hashlib
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from .notifications import buffered_notifications
+
+# API payloads worth compressing. HTML (the browsable API, with its CSRF
+# tokens) is left alone, which keeps BREACH-style attacks off the table.
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'text/csv',
+}
+# Preferred first when the client accepts both with the same q-value.
+ENCODINGS = ('br', 'gzip')
+
+
+class NotificationBufferMiddleware:
+    """
+    Holds notifications queued while handling a request and writes them as a
+    single batch once the response is ready (see store.notifications).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_notifications():
+            return self.get_response(request)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Returns 'br', 'gzip' or None for an Accept-Encoding header.
+
+    The coding with the highest q-value wins, Brotli on a tie. `*` stands for
+    codings that aren't listed, and q=0 rules a coding out.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        if coding:
+            qvalues[coding.lower()] = qvalue
+
+    best, best_qvalue = None, 0.0
+    for coding in ENCODINGS:
+        qvalue = qvalues.get(coding, qvalues.get('*', 0.0))
+        if qvalue > best_qvalue:
+            best, best_qvalue = coding, qvalue
+    return best
+
+
+def compress_brotli_sequence(sequence, quality):
+    """Brotli counterpart of compress_sequence(): flushes after every chunk."""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses API responses with Brotli or gzip, as negotiated with Accept-Encoding.
+
+    - Bodies under settings.COMPRESSION_MIN_SIZE bytes are sent as is, and so
+      are bodies that don't get smaller.
+    - Streaming responses (the exports) are compressed chunk by chunk.
+    - Responses flagged with `compression_cache = (key, timeout)` (see
+      CatalogCacheMixin) keep their compressed bytes in the cache next to
+      the cached payload, so a catalog page is compressed once per cache fill.
+    - ETags are made weak, like GZipMiddleware does, since the bytes differ
+      per encoding. Conditional GETs still match (weak comparison).
+
+    Must come before middleware reading or changing the response body.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = self.compress_sequence(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            content = self.get_compressed(response, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES or content_type.endswith('+json')
+
+    def compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return compress_string(content)
+
+    def compress_sequence(self, sequence, encoding):
+        if encoding == 'br':
+            return compress_brotli_sequence(sequence, self.brotli_quality)
+        return compress_sequence(sequence)
+
+    def get_compressed(self, response, encoding):
+        """Returns the compressed body, from the cache when the response is cacheable."""
+        cache_key, timeout = getattr(response, 'compression_cache', (None, None))
+        if cache_key is None:
+            return self.compress(response.content, encoding)
+
+        # The cached payload renders differently per format (and JSON indent).
+        content_type = hashlib.md5(response['Content-Type'].encode('utf-8')).hexdigest()
+        key = f'{cache_key}:{encoding}:{content_type}'
+        content = cache.get(key)
+        if content is None:
+            content = self.compress(response.content, encoding)
+            cache.set(key, content, timeout)
+        return content
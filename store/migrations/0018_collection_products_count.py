@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 18:57
+
+from django.db import migrations, models
+
+
+def backfill_counts(apps, schema_editor):
+    from store.counters import reconcile_products_counts
+    reconcile_products_counts(apps.get_model('store', 'Collection'), apps.get_model('store', 'Product'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='collection',
+            name='subtree_products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
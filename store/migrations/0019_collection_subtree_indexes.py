@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_collection_products_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['tree_id', 'lft', 'rght'], name='collection_subtree_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['collection', 'unit_price'], name='product_collection_price_idx'),
+        ),
+    ]
@@ -1,11 +1,9 @@
-from ast import mod
-from attr import validate
 from django.db import models
 from django.conf import settings
 from django.contrib import admin
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.db import models  
+from django.db import models, transaction
 from mptt.models import MPTTModel, TreeForeignKey  
 from core.models import User
 from .validators import validate_image_size
@@ -29,6 +27,16 @@ class Collection(MPTTModel):
         'Product', on_delete=models.SET_NULL, null=True, blank=True, related_name='featured_in_collections')
     parent = TreeForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children')
     attributes_schema = models.JSONField(default=dict)
+    # Maintained by store.counters, see store/signals.py.
+    products_count = models.PositiveIntegerField(default=0, editable=False)
+    subtree_products_count = models.PositiveIntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('products_count', 'subtree_products_count')
+
+    class Meta:
+        indexes = [
+            # Subtree lookups: tree_id = x AND lft >= y AND rght <= z.
+            models.Index(fields=['tree_id', 'lft', 'rght'], name='collection_subtree_idx'),
+        ]
 
     class MPTTMeta:
         order_insertion_by = ['title']
@@ -39,7 +47,17 @@ class Collection(MPTTModel):
     def save(self, *args, **kwargs):
         if Collection.objects.filter(title=self.title).exists():
             raise ValidationError('Collection with this title already exists.')
-        super().save(*args, **kwargs)
+        # django-mptt forgets the old parent while moving the node, keep it for
+        # the subtree count handler in store/signals.py.
+        self._old_parent_id = None if self._state.adding else self._mptt_cached_fields.get('parent')
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back the in-memory counters over the maintained ones.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 class Product(models.Model):
     title = models.CharField(max_length=255, unique=True)
@@ -54,8 +72,25 @@ class Product(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the signal handlers notice a collection change without a query.
+        if 'collection_id' in instance.__dict__:
+            instance._loaded_collection_id = instance.collection_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The collection counters are updated from post_save, commit them together.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['title']
+        indexes = [
+            # Collection (or subtree) listings filtered and ordered by price.
+            models.Index(fields=['collection', 'unit_price'], name='product_collection_price_idx'),
+        ]
 
 
 class ProductImages(models.Model):
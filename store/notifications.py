@@ -0,0 +1,114 @@
+"""
+Buffered notification pipeline.
+
+Signal handlers call `notify()` instead of creating Notification rows. Events
+are only collected once the surrounding transaction commits (so rolled back
+work never notifies anyone), held for the rest of the request by
+NotificationBufferMiddleware, and then written with a single bulk_create, or
+handed to the `store.tasks.create_notifications` Celery task when
+settings.NOTIFICATIONS_ASYNC is on.
+
+Events reference the recipient by user, cart or customer id and may contain a
+`{product}` placeholder; those are resolved in bulk when the batch is saved,
+so handlers never lazy-load related objects.
+"""
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import transaction
+
+from .models import Cart, Customer, Notification, Product
+
+_buffer = Local()
+
+
+def notify(message, *, user_id=None, cart_id=None, customer_id=None, product_id=None, is_admin=False):
+    """
+    Queues a notification for the owner of the given user, cart or customer.
+
+    Args:
+        message (str): Notification text, may contain `{product}`.
+        user_id (int): Recipient user id, if known.
+        cart_id (UUID): Cart whose owner receives the notification.
+        customer_id (int): Customer whose user receives the notification.
+        product_id (int): Product whose title fills `{product}`.
+        is_admin (bool): Whether this is an admin/system notification.
+    """
+    event = {
+        'message': message,
+        'user_id': user_id,
+        'cart_id': str(cart_id) if cart_id is not None else None,
+        'customer_id': customer_id,
+        'product_id': product_id,
+        'is_admin': is_admin,
+    }
+    transaction.on_commit(partial(_collect, event))
+
+
+def _collect(event):
+    events = getattr(_buffer, 'events', None)
+    if events is None:
+        dispatch([event])
+    else:
+        events.append(event)
+
+
+@contextmanager
+def buffered_notifications():
+    """Collects notifications queued inside the block and dispatches them as one batch."""
+    outermost = getattr(_buffer, 'events', None) is None
+    if outermost:
+        _buffer.events = []
+    try:
+        yield
+    finally:
+        if outermost:
+            events = _buffer.events
+            _buffer.events = None
+            if events:
+                dispatch(events)
+
+
+def dispatch(events):
+    if getattr(settings, 'NOTIFICATIONS_ASYNC', False):
+        from .tasks import create_notifications
+        create_notifications.delay(events)
+    else:
+        save_notifications(events)
+
+
+def save_notifications(events):
+    """
+    Resolves recipients and product titles for a batch of events and writes
+    them with one bulk_create. Events whose recipient no longer exists (e.g.
+    the cart was deleted meanwhile) are dropped.
+
+    Returns:
+        list: The created Notification instances.
+    """
+    cart_ids = {event['cart_id'] for event in events if event['user_id'] is None and event['cart_id']}
+    customer_ids = {event['customer_id'] for event in events if event['user_id'] is None and event['customer_id']}
+    product_ids = {event['product_id'] for event in events if event['product_id']}
+
+    cart_users = {
+        str(pk): user_id for pk, user_id in Cart.objects.filter(pk__in=cart_ids).values_list('pk', 'user_id')
+    } if cart_ids else {}
+    customer_users = dict(
+        Customer.objects.filter(pk__in=customer_ids).values_list('pk', 'user_id')
+    ) if customer_ids else {}
+    titles = dict(
+        Product.objects.filter(pk__in=product_ids).values_list('pk', 'title')
+    ) if product_ids else {}
+
+    notifications = []
+    for event in events:
+        user_id = event['user_id'] or cart_users.get(event['cart_id']) or customer_users.get(event['customer_id'])
+        if user_id is None:
+            continue
+        message = event['message']
+        if event['product_id']:
+            message = message.format(product=titles.get(event['product_id'], ''))
+        notifications.append(Notification(user_id=user_id, message=message, is_admin=event['is_admin']))
+    return Notification.objects.bulk_create(notifications)
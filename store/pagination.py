@@ -1,4 +1,185 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class DefaultPagination(PageNumberPagination):
-    page_size = 10
\ No newline at end of file
+    page_size = 10
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over the queryset's ordering.
+
+    Each page is fetched with a `WHERE (a, pk) > (last_a, last_pk)` style
+    predicate instead of an OFFSET, and no COUNT(*) is issued, so deep pages
+    cost the same as the first one. The primary key is appended to the
+    ordering as a tiebreaker, so ordering by non-unique columns is stable.
+
+    Keyset mode is selected per request with `?pagination=cursor` (or by
+    following a `?cursor=` link). Otherwise `fallback_class` paginates the
+    request, or the list is returned unpaginated when it is None.
+
+    Ordering is taken from the queryset (e.g. as set by OrderingFilter), then
+    the model's Meta.ordering, then the view's `keyset_ordering`. Only
+    non-null local fields may be used.
+    """
+    page_size = 10
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode_query_value = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+    fallback_class = None
+
+    def __init__(self):
+        self.fallback = None
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == self.mode_query_value
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            if self.fallback_class is None:
+                return None
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        cursor = self.decode_cursor(request)
+
+        reverse = bool(cursor and cursor['r'])
+        ordering = [(name, desc != reverse) for name, desc in self.ordering]
+        queryset = queryset.order_by(*[('-' if desc else '') + name for name, desc in ordering])
+        if cursor:
+            queryset = queryset.filter(self.get_position_filter(ordering, cursor['v']))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        # Moving backwards we know a next page exists (we came from it);
+        # moving forwards a previous page exists whenever a cursor was given.
+        self.has_next = True if reverse else has_more
+        self.has_previous = has_more if reverse else cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response_schema(schema)
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_ordering(self, queryset, view):
+        """
+        Returns the ordering as a list of (field name, descending) pairs,
+        ending with the primary key.
+        """
+        model = queryset.model
+        if queryset.query.order_by:
+            names = list(queryset.query.order_by)
+        elif queryset.query.default_ordering and model._meta.ordering:
+            names = list(model._meta.ordering)
+        else:
+            names = list(getattr(view, 'keyset_ordering', None) or ['-pk'])
+
+        pk_name = model._meta.pk.name
+        ordering = []
+        for name in names:
+            if not isinstance(name, str):
+                raise NotFound(self.invalid_cursor_message)
+            desc = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                name = pk_name
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise NotFound(self.invalid_cursor_message)
+            if field.null or not field.concrete:
+                raise NotFound(self.invalid_cursor_message)
+            ordering.append((field.attname, desc))
+
+        if pk_name not in [name for name, desc in ordering]:
+            ordering.append((model._meta.pk.attname, ordering[0][1] if ordering else False))
+        self.fields = [model._meta.get_field(name) for name, desc in ordering]
+        return ordering
+
+    def get_position_filter(self, ordering, values):
+        """
+        Builds `(a > x) OR (a = x AND b > y) OR ...` for the given position.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, desc), value in zip(ordering, values):
+            lookup = 'lt' if desc else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict): # a .values() row, see store.fastpath
+            obj = SimpleNamespace(**obj)
+        values = [field.value_to_string(obj) for field in self.fields]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, raw_values)]
+            return {'v': values, 'r': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class DefaultOrKeysetPagination(KeysetPagination):
+    """Page-number pagination by default, keyset pagination on request."""
+    fallback_class = DefaultPagination
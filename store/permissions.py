@@ -1,6 +1,7 @@
 from typing import override
 from rest_framework.permissions import BasePermission
 from rest_framework import permissions
+from django.core.exceptions import ValidationError
 
 from store.models import Cart, CartItem
 
@@ -37,25 +38,40 @@ class NotificationsPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # Check if the user is trying to view their own notification
         if request.method in permissions.SAFE_METHODS:
-            return obj.user == request.user and request.user.is_authenticated
+            return obj.user_id == request.user.id and request.user.is_authenticated
         
         # Only admin can update and delete notifications
         return bool(request.user and request.user.is_staff and request.user.is_authenticated)
 
+def owns_cart(request, view):
+    """
+    Returns whether the requesting user may use the cart in the URL
+    (`cart_pk`): its owner, or any staff user.
+
+    Resolved with a single EXISTS query and cached on the view, so the
+    permission classes, CartItemViewSet.get_queryset and perform_create all
+    share one lookup per request.
+    """
+    if not hasattr(view, '_owns_cart'):
+        try:
+            carts = Cart.objects.filter(pk=view.kwargs.get('cart_pk'))
+            if not request.user.is_staff:
+                carts = carts.filter(user_id=request.user.id)
+            view._owns_cart = carts.exists()
+        except (ValidationError, ValueError): # not a valid cart uid
+            view._owns_cart = False
+    return view._owns_cart
+
+
 class IsCartOwner(permissions.BasePermission):
     """
     Custom permission to only allow owners of a cart to view, edit or delete it.
     """
     def has_permission(self, request, view, obj=None):
-        cart_id = view.kwargs.get('cart_pk')
-        try:
-            cart = Cart.objects.get(pk=cart_id)
-            return cart.user == request.user
-        except Cart.DoesNotExist:
-            return False
+        return owns_cart(request, view)
     
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        return obj.user_id == request.user.id
     
 
 class IsCartItemOwner(permissions.BasePermission):
@@ -63,12 +79,7 @@ class IsCartItemOwner(permissions.BasePermission):
     Custom permission to only allow owners of a cart item to view, edit or delete it.
     """
     def has_permission(self, request, view, obj=None):
-        cart_item_id = view.kwargs.get('pk')
-        try:
-            cart_item = CartItem.objects.get(pk=cart_item_id)
-            return cart_item.cart.user == request.user
-        except CartItem.DoesNotExist:
-            return False
+        return owns_cart(request, view)
     
     def has_object_permission(self, request, view, obj):
-        return obj.cart.user == request.user
+        return str(obj.cart_id) == str(view.kwargs.get('cart_pk')) and owns_cart(request, view)
@@ -0,0 +1,94 @@
+"""
+Fast renderers used as the API defaults, plus the export formats.
+
+UJSON and MessagePack share DRF's JSONEncoder.default for types the encoders don't know, so
+Decimal (OrderItem.unit_price, price_with_tax), UUID (Cart.uid,
+CartItem.uid), datetimes and lazy strings come out exactly as they do with
+DRF's JSONRenderer.
+"""
+import csv
+import io
+import json
+
+import msgpack
+import ujson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encode_default = JSONEncoder().default
+
+
+class UJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer using ujson. Output is compact unless the client asks for
+    `indent=` in the Accept header (or the browsable API does).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context) or 0
+
+        ret = ujson.dumps(
+            data, default=_encode_default, indent=indent,
+            ensure_ascii=self.ensure_ascii, escape_forward_slashes=False,
+            reject_bytes=True,
+        )
+        # Keep the output a strict javascript subset, like JSONRenderer.
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders `application/msgpack`, selected with the Accept header or ?format=msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_default, use_bin_type=True)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders `application/x-ndjson`, one JSON document per line.
+
+    Export actions stream their own body (see store/exports.py). This renders
+    everything else they return, such as errors, with one line per object.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n' for row in rows).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders `text/csv` from a dict or a list of flat dicts, keys as the header.
+
+    Like NDJSONRenderer, only used for what export actions don't stream.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue().encode()
@@ -0,0 +1,175 @@
+"""
+Full-text product search.
+
+PostgreSQL keeps a generated `search_vector` tsvector column on
+store_product (title weighted above description) behind a GIN index.
+SQLite keeps an FTS5 shadow table, store_product_fts, synced by triggers.
+Both are maintained by the database itself, so saves, bulk_create and
+queryset.update() all stay in sync without signals.
+
+Other backends fall back to DRF's icontains search over `search_fields`.
+"""
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+from .pagination import KeysetPagination
+
+SEARCH_CONFIG = 'english'
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE store_product ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS store_product_search_vector_gin ON store_product USING gin (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS store_product_search_vector_gin",
+    "ALTER TABLE store_product DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS store_product_fts USING fts5(
+        title, description,
+        content='store_product', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+"""
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS store_product_fts_insert AFTER INSERT ON store_product BEGIN
+        INSERT INTO store_product_fts(rowid, title, description)
+        VALUES (new.id, new.title, coalesce(new.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS store_product_fts_delete AFTER DELETE ON store_product BEGIN
+        INSERT INTO store_product_fts(store_product_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, coalesce(old.description, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS store_product_fts_update AFTER UPDATE OF title, description ON store_product BEGIN
+        INSERT INTO store_product_fts(store_product_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, coalesce(old.description, ''));
+        INSERT INTO store_product_fts(rowid, title, description)
+        VALUES (new.id, new.title, coalesce(new.description, ''));
+    END
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS store_product_fts_insert",
+    "DROP TRIGGER IF EXISTS store_product_fts_delete",
+    "DROP TRIGGER IF EXISTS store_product_fts_update",
+    "DROP TABLE IF EXISTS store_product_fts",
+]
+
+
+def is_supported(conn=connection):
+    return conn.vendor in ('postgresql', 'sqlite')
+
+
+def install(conn=connection):
+    """
+    Creates the search index for the connection's backend. Idempotent.
+
+    On SQLite the triggers are lost whenever a migration rebuilds
+    store_product, so this also runs after every migrate (see
+    StoreConfig.ready) and rebuilds the index when they were missing.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            for sql in POSTGRES_INSTALL:
+                cursor.execute(sql)
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'store_product_fts_%'"
+            )
+            complete = cursor.fetchone()[0] == len(SQLITE_TRIGGERS)
+            cursor.execute(SQLITE_TABLE)
+            for sql in SQLITE_TRIGGERS:
+                cursor.execute(sql)
+            if not complete:
+                cursor.execute("INSERT INTO store_product_fts(store_product_fts) VALUES ('rebuild')")
+
+
+def uninstall(conn=connection):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            statements = POSTGRES_UNINSTALL
+        elif conn.vendor == 'sqlite':
+            statements = SQLITE_UNINSTALL
+        else:
+            statements = []
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install_after_migrate(sender, using, **kwargs):
+    """post_migrate receiver re-creating SQLite triggers dropped by table rebuilds."""
+    conn = connections[using]
+    if conn.vendor == 'sqlite':
+        install(conn)
+
+
+def sqlite_match_expression(terms):
+    """Quotes every term so user input can't inject FTS5 query syntax."""
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_products(queryset, text):
+    """
+    Filters a Product queryset by full-text match on `text` and annotates
+    `search_rank` (higher is more relevant).
+    """
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f'{table}.search_vector @@ {tsquery}', [text], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank({table}.search_vector, {tsquery})', [text], output_field=FloatField())
+        )
+
+    match = sqlite_match_expression(text.split())
+    # bm25() is lower for better matches, negate it so both backends rank descending.
+    return queryset.filter(
+        id__in=RawSQL('SELECT rowid FROM store_product_fts WHERE store_product_fts MATCH %s', [match])
+    ).annotate(
+        search_rank=RawSQL(
+            'SELECT -bm25(store_product_fts) FROM store_product_fts '
+            f'WHERE store_product_fts MATCH %s AND rowid = {table}.id',
+            [match], output_field=FloatField()
+        )
+    )
+
+
+class ProductSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on ProductViewset backed by the
+    full-text index. Results are ordered by relevance unless the client asks
+    for an explicit ?ordering= or keyset pagination, which needs a model
+    field ordering.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not is_supported():
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        queryset = search_products(queryset, ' '.join(terms))
+        paginator = getattr(view, 'paginator', None)
+        if isinstance(paginator, KeysetPagination) and paginator.is_requested(request):
+            return queryset
+        return queryset.order_by('-search_rank', 'pk')
@@ -1,16 +1,19 @@
-from hmac import new
-from operator import truediv
-from typing import override
-from attr import validate
-from django.db import transaction
+import uuid
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
 from rest_framework.reverse import reverse
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from decimal import Decimal
 from .models import Product, Collection , Review, Cart, CartItem, \
       Customer, Order, OrderItem, Notification, ProductImages
 from core.models import User
+from .signals import notify_order_items
+from .inventory import reserve_inventory
+from .customers import get_customer_id
 from django.utils.text import slugify
-from store.test_tools.tools import custom_logger
 
 
 class CollectionSerializer(serializers.ModelSerializer):  
@@ -22,14 +25,32 @@ class CollectionSerializer(serializers.ModelSerializer):
     products_link = serializers.SerializerMethodField(method_name='get_products_link')
 
     def get_products_link(self, obj):
-        request = self.context.get('request')
-        url = reverse('products-list', request=request)
-        return f'{url}?collection_id={obj.id}'
+        # Resolved once per serializer: a list reuses one child serializer for every row.
+        if not hasattr(self, '_products_url'):
+            self._products_url = reverse('products-list', request=self.context.get('request'))
+        return f'{self._products_url}?collection_id={obj.id}'
     
     def validate_title(self, value):
         if Collection.objects.filter(title=value).exists():
             raise serializers.ValidationError('Collection with this title already exists!')
         return value
+
+
+class CollectionTreeSerializer(CollectionSerializer):
+    """
+    A collection with its descendants nested under `children`.
+
+    Expects root nodes from get_cached_trees(), so walking the children
+    doesn't query.
+    """
+    class Meta:
+        model = Collection
+        fields = ['id', 'title', 'products_count', 'subtree_products_count', 'products_link', 'children']
+
+    children = serializers.SerializerMethodField(method_name='get_children')
+
+    def get_children(self, obj):
+        return [self.to_representation(child) for child in obj.get_children()]
     
 class ProductImageSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
@@ -96,7 +117,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         user = self.context['request'].user
-        if not user.is_superuser and instance.user != user:
+        if not user.is_superuser and instance.user_id != user.id:
             raise serializers.ValidationError('You do not have permission to update this review')
         return super().update(instance, validated_data)
 
@@ -105,24 +126,54 @@ class SimpleProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'title', 'unit_price']
-    
+
+
+def with_item_totals(queryset):
+    """
+    Annotates a CartItem queryset with `total_price` (quantity * unit price),
+    computed by the database.
+    """
+    return queryset.annotate(total_price=ExpressionWrapper(
+        F('quantity') * F('product__unit_price'), output_field=BigIntegerField()
+    ))
+
+
+def with_cart_totals(queryset):
+    """
+    Annotates a Cart queryset with `total_price`, the sum of its item totals
+    (0 for an empty cart), computed by the database.
+    """
+    return queryset.annotate(total_price=Coalesce(
+        Sum(F('items__quantity') * F('items__product__unit_price'), output_field=BigIntegerField()),
+        Value(0),
+    ))
+
+
 class CartItemSerializer(serializers.ModelSerializer):
+    """Reads `total_price` from with_item_totals() when the queryset was annotated."""
     product = SimpleProductSerializer()
     total_price = serializers.SerializerMethodField()
 
     def get_total_price(self, cart_item: CartItem):
-        return cart_item.quantity * cart_item.product.unit_price
+        total_price = getattr(cart_item, 'total_price', None)
+        if total_price is None:
+            return cart_item.quantity * cart_item.product.unit_price
+        return total_price
     class Meta:
         model = CartItem
         fields = ['uid', 'product', 'quantity', 'total_price']
 
 class CartSerializer(serializers.ModelSerializer):
+    """Reads `total_price` from with_cart_totals() when the queryset was annotated."""
     uid = serializers.UUIDField(read_only=True)
     items = CartItemSerializer(many=True, read_only=True) 
     total_price = serializers.SerializerMethodField()
 
     def get_total_price(self, cart: Cart):
-        return sum([item.quantity * item.product.unit_price for item in cart.items.all()])
+        total_price = getattr(cart, 'total_price', None)
+        if total_price is None:
+            return with_cart_totals(Cart.objects.filter(pk=cart.pk)).values_list('total_price', flat=True).first() or 0
+        return total_price
     class Meta:
         model = Cart
         fields = ['uid', 'items', 'total_price', 'user_id']
@@ -131,59 +182,95 @@ class CartSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         with transaction.atomic():
             user = self.context.get('user')
-            validated_data['user'] = user
+            validated_data.pop('user', None)
+            validated_data['user_id'] = user.id # an id, so a token-backed request.user is never loaded
             return super().create(validated_data)
 
 
 class AddCartItemSerializer(serializers.ModelSerializer):
+    """
+    Adds a product to a cart, or increases its quantity when already there.
+
+    Validation and the write happen in a single statement:
+        INSERT ... SELECT ... FROM store_product WHERE inventory >= quantity
+        ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity
+        WHERE <new total> <= inventory
+        RETURNING uid, quantity
+    relying on CartItem's unique (cart, product) constraint. Nothing comes back
+    when the product does not exist or inventory is insufficient; only then is
+    a second query issued to tell the two apart.
+    """
     product_id = serializers.IntegerField() 
+    # The model field allows 0, which would put an out-of-stock product in the cart.
+    quantity = serializers.IntegerField(min_value=1, max_value=32767)
 
     def validate_product_id(self, value): # validate method: validate_ + field (product_id)
-        if  not Product.objects.filter(pk=value).exists():
+        if value < 1:
             raise serializers.ValidationError('Does not found any product match with this id.')
         return value
-    
-    def validate(self, data):
-        product_id = data['product_id']
-        quantity = data['quantity']
 
-        try:
-            product = Product.objects.get(pk=product_id)
-        except Product.DoesNotExist:
-            raise serializers.ValidationError('Does not found any product match with this id.')
-        
-        # Check if adding to existing cart item
-        cart_id = self.context['cart_id']
-        try:
-            cart_item = CartItem.objects.get(cart_id=cart_id, product_id=product_id)
-            total_quantity = cart_item.quantity + quantity
-        except CartItem.DoesNotExist:
-            total_quantity = quantity
-
-        if total_quantity > product.inventory:
-            raise serializers.ValidationError('Not enough inventory')
-        if product.inventory < 1:
-            raise serializers.ValidationError('Not enough inventory')
-        
-        return data
-    
+    def upsert(self, cart_id, product_id, quantity):
+        """
+        Runs the guarded upsert.
+
+        Returns:
+            tuple: (uid, quantity, created) or None when nothing was written.
+        """
+        uid_field = CartItem._meta.get_field('uid')
+        cart_field = CartItem._meta.get_field('cart')
+        cart_id = cart_field.target_field.to_python(cart_id)
+        new_uid = uuid.uuid4()
+        item_table = CartItem._meta.db_table
+        product_table = Product._meta.db_table
+
+        sql = f"""
+            INSERT INTO {item_table} (uid, cart_id, product_id, quantity)
+            SELECT %s, %s, p.id, %s FROM {product_table} p
+            WHERE p.id = %s AND p.inventory >= %s
+            ON CONFLICT (cart_id, product_id) DO UPDATE
+                SET quantity = {item_table}.quantity + excluded.quantity
+                WHERE {item_table}.quantity + excluded.quantity <= (
+                    SELECT inventory FROM {product_table} WHERE id = excluded.product_id
+                )
+            RETURNING uid, quantity
+        """
+        params = [
+            uid_field.get_db_prep_value(new_uid, connection),
+            cart_field.target_field.get_db_prep_value(cart_id, connection),
+            quantity, product_id, quantity,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        uid = uid_field.to_python(row[0])
+        return uid, row[1], uid == new_uid
 
     def save(self, **kwargs):
-        with transaction.atomic():
-            cart_id = self.context['cart_id'] # came from view: overrided of get_serializer_context
-            product_id = self.validated_data['product_id']
-            quantity = self.validated_data['quantity']
-
-            try:
-                # update an existing item
-                cart_item = CartItem.objects.get(cart_id=cart_id, product_id=product_id)
-                cart_item.quantity += quantity
-                cart_item.save()
-                self.instance = cart_item
-            except CartItem.DoesNotExist:
-                # create a new item
-                self.instance = CartItem.objects.create(cart_id=cart_id, **self.validated_data)
+        cart = kwargs.get('cart')
+        cart_id = cart.pk if cart is not None else self.context['cart_id'] # came from view: overrided of get_serializer_context
+        product_id = self.validated_data['product_id']
+        quantity = self.validated_data['quantity']
 
+        with transaction.atomic():
+            result = self.upsert(cart_id, product_id, quantity)
+            if result is None:
+                if not Product.objects.filter(pk=product_id).exists():
+                    raise serializers.ValidationError({'product_id': 'Does not found any product match with this id.'})
+                raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ['Not enough inventory']})
+
+            uid, total_quantity, created = result
+            self.instance = CartItem(uid=uid, cart_id=cart_id, product_id=product_id, quantity=total_quantity)
+            self.instance._state.adding = False
+            self.instance._state.db = connection.alias
+            if cart is not None:
+                self.instance.cart = cart
+            # The raw statement bypasses Model.save(), send post_save ourselves.
+            post_save.send(
+                sender=CartItem, instance=self.instance, created=created,
+                update_fields=None, raw=False, using=connection.alias,
+            )
             return self.instance
         
     class Meta:
@@ -261,8 +348,8 @@ class CreateOrderSerializer(serializers.Serializer):
     def save(self, **kwargs):
         with transaction.atomic():
             cart_id = self.validated_data['cart_id']
-            customer, is_created = Customer.objects.get_or_create(user_id=self.context['user_id'])
-            order = Order.objects.create(customer=customer)
+            customer_id = self.context.get('customer_id') or get_customer_id(self.context['user_id'])
+            order = Order.objects.create(customer_id=customer_id)
             cart_items = CartItem.objects.select_related('product').filter(cart_id=cart_id)
             order_items = [
                 OrderItem(
@@ -271,12 +358,16 @@ class CreateOrderSerializer(serializers.Serializer):
                     unit_price=item.product.unit_price,
                     quantity=item.quantity
                 ) 
-            for item in cart_items
-        ]
-        OrderItem.objects.bulk_create(order_items)
-
-        Cart.objects.filter(pk=cart_id).delete()
-        return order
+                for item in cart_items
+            ]
+            OrderItem.objects.bulk_create(order_items)
+            # bulk_create does not send post_save, notify like order_item_added would.
+            notify_order_items(customer_id, [item.product_id for item in order_items])
+
+            Cart.objects.filter(pk=cart_id).delete()
+            # Reserve last, so the product rows stay locked only until commit.
+            reserve_inventory([(item.product_id, item.quantity) for item in order_items])
+            return order
 
 class UserNotificationsSerializer(serializers.ModelSerializer):
     """
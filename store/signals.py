@@ -1,8 +1,35 @@
-from email import message
-from itertools import product
-from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db.models.query_utils import DeferredAttribute
 from django.dispatch import receiver
-from .models import Cart, CartItem, Order, OrderItem, Notification, Customer
+from .models import Cart, CartItem, Order, OrderItem, Product, ProductImages, Collection, Customer
+from .cache import bump_catalog_version_on_commit
+from .conditional import bump_cart_version_on_commit
+from .counters import adjust_products_count, move_subtree_count
+from .notifications import notify
+from .customers import forget_customer
+
+
+def cart_owner(cart_item):
+    """Returns notify() recipient kwargs for a cart item without loading its cart."""
+    if CartItem.cart.is_cached(cart_item):
+        return {'user_id': cart_item.cart.user_id}
+    return {'cart_id': cart_item.cart_id}
+
+
+def notify_order_items(customer_id, product_ids):
+    """Notifies a customer about products added to their order.
+
+    Called from order_item_added and explicitly after OrderItem.objects.bulk_create,
+    which does not send post_save.
+    """
+    for product_id in product_ids:
+        notify(
+            'Product {product} has been added to your order.',
+            customer_id=customer_id,
+            product_id=product_id,
+            is_admin=True
+        )
+
 
 @receiver(post_save, sender=Cart)
 def cart_created(sender, instance, created, **kwargs):
@@ -15,9 +42,9 @@ def cart_created(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments.
     """
     if created:
-        Notification.objects.create(
-            user=instance.user,
-            message=f'Your cart has been created: {instance.uid}',
+        notify(
+            f'Your cart has been created: {instance.uid}',
+            user_id=instance.user_id,
             is_admin=False
         )
 
@@ -31,82 +58,134 @@ def cart_item_changed(sender, instance, created, **kwargs):
         created (bool): Whether the instance is created.
         **kwargs: Additional keyword arguments.
     """
-    cart = instance.cart
-    product = instance.product
-
     if created:
-        message = f'Product {product.title} has been added to your cart.'
+        message = 'Product {product} has been added to your cart.'
     else:
-        message = f'Quantity of product {product.title} has been changed to {instance.quantity}. '
+        message = f'Quantity of product {{product}} has been changed to {instance.quantity}. '
     
-    Notification.objects.create(
-        user=cart.user,
-        message=message,
-        is_admin=False
-    )
+    bump_cart_version_on_commit(instance.cart_id)
+    notify(message, product_id=instance.product_id, is_admin=False, **cart_owner(instance))
 
 @receiver(post_delete, sender=CartItem)
 def cart_item_removed(sender, instance, **kwargs):
-    """Send notification if a cart item removed"""
-    try:
-        cart = instance.cart
-        product = instance.product
-
-        message = f'Product {product.title} has been removed from your cart.'
-        
-        Notification.objects.create(
-            user=cart.user,
-            message=message,
-            is_admin=False
-        )
-    except (Cart.DoesNotExist, AttributeError):
-        # Cart might have been deleted already
-        pass
+    """Send notification if a cart item removed
+    
+    Dropped when the cart itself is gone by the time notifications are saved.
+    """
+    bump_cart_version_on_commit(instance.cart_id)
+    notify(
+        'Product {product} has been removed from your cart.',
+        product_id=instance.product_id,
+        is_admin=False,
+        **cart_owner(instance)
+    )
+
+@receiver(post_delete, sender=Cart)
+def cart_deleted(sender, instance, **kwargs):
+    """Changes the version of a deleted cart, so its ETag no longer matches."""
+    bump_cart_version_on_commit(instance.pk)
 
 @receiver(post_save, sender=Order)
 def order_status_changed(sender, instance, created, **kwargs):
     """Send notification when an order is created or if order status changed"""
     if instance.pk and created:
         if instance.payment_status == Order.PAYMENT_STATUS_COMPLETE:
-            Notification.objects.create(
-                user=instance.user,
-                message=f'Your order {instance.pk} has been paid.',
+            notify(
+                f'Your order {instance.pk} has been paid.',
+                customer_id=instance.customer_id,
                 is_admin=False
             )
         elif instance.payment_status == Order.PAYMENT_STATUS_FAILED:
-            Notification.objects.create(
-                user=instance.user,
-                message=f'Your order {instance.pk} has failed.',
+            notify(
+                f'Your order {instance.pk} has failed.',
+                customer_id=instance.customer_id,
                 is_admin=False
             )
         elif instance.payment_status == Order.PAYMENT_STATUS_PENDING:
-            Notification.objects.create(
-                user=instance.user,
-                message=f'Your order {instance.pk} is pending.',
+            notify(
+                f'Your order {instance.pk} is pending.',
+                customer_id=instance.customer_id,
                 is_admin=False
             )
 
-    user = instance.user
-
     if created:
         message = f"Your order #{instance.pk} has been placed successfully."
     else:
         message = f"Your order #{instance.pk} has been updated to {instance.get_payment_status_display()}."
     
-    Notification.objects.create(
-        user=user,
-        message=message,
+    notify(
+        message,
+        customer_id=instance.customer_id,
         is_admin=True # This is from admin/sytem notifications
     )
 
 @receiver(post_save, sender=OrderItem)
 def order_item_added(sender, instance, created, **kwargs):
     if created:
-        order = instance.order
-        product = instance.product
-        message = f'Product {product.title} has been added to your order.'
-        Notification.objects.create(
-            user=instance.user,
-            message=message,
-            is_admin=True
-        )
+        notify_order_items(instance.order.customer_id, [instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImages)
+@receiver(post_delete, sender=ProductImages)
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def catalog_changed(sender, instance, **kwargs):
+    """Invalidate cached catalog reads when products, images or collections change"""
+    bump_catalog_version_on_commit()
+
+
+def loaded_value(instance, attname):
+    """Returns the database value of a field as of before this save.
+
+    Uses the value recorded by the model's from_db() and only queries for
+    instances that were not loaded from the database (or had it deferred).
+    """
+    try:
+        return getattr(instance, f'_loaded_{attname}')
+    except AttributeError:
+        return type(instance)._default_manager.filter(pk=instance.pk).values_list(attname, flat=True).first()
+
+
+@receiver(pre_save, sender=Product)
+def product_collection_before_save(sender, instance, raw=False, **kwargs):
+    if not raw and not instance._state.adding:
+        instance._old_collection_id = loaded_value(instance, 'collection_id')
+
+
+@receiver(post_save, sender=Product)
+def product_counted(sender, instance, created, raw=False, **kwargs):
+    """Keep Collection.products_count and its subtree roll-up in step with products"""
+    if raw:
+        return # loaddata: run reconcile_collection_counts afterwards
+    old_collection_id = None if created else getattr(instance, '_old_collection_id', None)
+    if old_collection_id != instance.collection_id:
+        if old_collection_id is not None:
+            adjust_products_count(Collection, old_collection_id, -1)
+        adjust_products_count(Collection, instance.collection_id, 1)
+    instance._loaded_collection_id = instance.collection_id
+
+
+@receiver(post_delete, sender=Product)
+def product_uncounted(sender, instance, **kwargs):
+    adjust_products_count(Collection, instance.collection_id, -1)
+
+
+@receiver(post_save, sender=Collection)
+def collection_moved(sender, instance, created, raw=False, **kwargs):
+    """Move a re-parented collection's products from its old ancestors' subtree counts to the new ones"""
+    if raw or created:
+        return
+    old_parent_id = getattr(instance, '_old_parent_id', DeferredAttribute) # set by Collection.save
+    if old_parent_id is DeferredAttribute:
+        return # parent wasn't loaded, so it wasn't changed either
+    if old_parent_id != instance.parent_id:
+        count = Collection.objects.filter(pk=instance.pk).values_list('subtree_products_count', flat=True).first()
+        move_subtree_count(Collection, old_parent_id, instance.parent_id, count or 0)
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    """Drop the cached user -> customer mapping"""
+    forget_customer(instance.user_id)
@@ -0,0 +1,13 @@
+from celery import shared_task
+from .notifications import save_notifications
+
+
+@shared_task
+def create_notifications(events):
+    """
+    Writes a batch of buffered notification events (see store.notifications).
+
+    :param events: List of event dicts queued by notify()
+    :return: Number of notifications created
+    """
+    return len(save_notifications(events))
@@ -1,14 +1,17 @@
-import inspect
-from colorama import Fore, Style
-
-def custom_logger(message, color=Fore.BLUE):
-    """Custom log function that also shows the calling line"""
-    # Get the frame of the caller
-    frame = inspect.currentframe().f_back
-    # Get the line number and code context
-    line_no = frame.f_lineno
-    # Get the source code of the calling line
-    filename = frame.f_code.co_filename
-    # Print the calling line and the message
-    print(f"{Fore.YELLOW}[{filename}:{line_no}]{Style.RESET_ALL}")
-    print(color + str(message) + Style.RESET_ALL)
+import logging
+
+logger = logging.getLogger('store.debug')
+
+
+def custom_logger(message, *args, level=logging.DEBUG):
+    """
+    Logs a debug message from the calling line, e.g.
+    custom_logger('Retrieved %s products', len(ids)).
+
+    The record carries the caller's file and line, and `args` are only
+    interpolated when the 'store.debug' logger is enabled for `level`, so
+    disabled calls cost a single level check. Output goes through the JSON
+    log handlers.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, stacklevel=2)
@@ -1,10 +1,27 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import uuid
 from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import brotli
 from os import name
 from typing import override
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.forms import ValidationError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from store.management.commands.import_audit import parse_importtime
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import status
@@ -18,7 +35,20 @@ from .serializer import ProductSerializer,\
     CreateOrderSerializer, UpdateOrderSerializer, ProductImageSerializer
 
 
+from store.notifications import buffered_notifications, notify
+from store.inventory import reserve_inventory, bulk_update_stock, MAX_INVENTORY
+from store.exceptions import InsufficientStockError
+from store.customers import get_customer_id, forget_customer
+from store.middleware import negotiate_encoding
+from store.cache import CATALOG_VERSION_KEY
+from rest_framework_simplejwt.tokens import AccessToken
+from store.renderers import MessagePackRenderer, UJSONRenderer
+from store.parsers import MessagePackParser, UJSONParser
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+import msgpack
 from store.test_tools.tools import custom_logger
+from storefront.logs import QueueLogHandler
 
 User = get_user_model()
 
@@ -393,3 +423,1168 @@ class NotificationTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.notification1.refresh_from_db()
         self.assertEqual(self.notification1.message, 'Modified message')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProductCacheTests(TestCase):
+    """Test the read-through cache around the product endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.collection = Collection.objects.create(title='Cached Collection')
+        self.product = Product.objects.create(
+            title='Cached Product', unit_price=10, inventory=5, collection=self.collection
+        )
+        self.list_url = reverse('products-list')
+        self.detail_url = reverse('products-detail', args=[self.product.id])
+
+    def test_repeated_list_is_served_from_cache(self):
+        self.client.get(self.list_url, {'page': 1})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, {'page': 1, 'unknown': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['title'], 'Cached Product')
+
+    def test_product_change_invalidates_cache(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.title = 'Renamed Product'
+            self.product.save()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['title'], 'Renamed Product')
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        self.client.get(self.detail_url)
+        cache.delete(CATALOG_VERSION_KEY)
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.title = 'Renamed After Eviction'
+            self.product.save()
+        cache.delete(CATALOG_VERSION_KEY)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['title'], 'Renamed After Eviction')
+
+    def test_filters_use_separate_entries(self):
+        other = Collection.objects.create(title='Other Collection')
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url, {'collection_id': other.id})
+        self.assertEqual(response.data['count'], 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConditionalGetTests(TestCase):
+    """Test ETag/Last-Modified validators and 304 responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='etag', password='Etag!2345', email='etag@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.collection = Collection.objects.create(title='Etag Collection')
+            self.product = Product.objects.create(
+                title='Etag Product', unit_price=10, inventory=5, collection=self.collection
+            )
+        self.cart = Cart.objects.create(user=self.user)
+        self.cart_url = f'/store/carts/{self.cart.uid}/'
+
+    def test_product_list_not_modified(self):
+        url = reverse('products-list')
+        response = self.client.get(url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_product_change_changes_etag(self):
+        url = reverse('products-detail', args=[self.product.id])
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.unit_price = 12
+            self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        url = reverse('products-detail', args=[self.product.id])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_depends_on_query_and_format(self):
+        url = reverse('products-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'search': 'etag'})['ETag'], etag)
+        self.assertNotEqual(self.client.get(url, {'format': 'msgpack'})['ETag'], etag)
+
+    def test_collection_tree_not_modified(self):
+        url = '/store/collections/tree/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cart_not_modified_until_items_change(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.cart_url)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.cart_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CartItem.objects.create(cart=self.cart, product=self.product, quantity=1)
+        response = self.client.get(self.cart_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['items']), 1)
+
+    def test_cart_etag_is_per_user(self):
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.cart_url)['ETag']
+        other = User.objects.create_user(username='etag2', password='Etag!2345', email='etag2@example.com')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.cart_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    COMPRESSION_MIN_SIZE=200,
+)
+class CompressionMiddlewareTests(TestCase):
+    """Test Brotli/gzip compression of API responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        collection = Collection.objects.create(title='Compressed Collection')
+        for i in range(10):
+            Product.objects.create(
+                title=f'Compressed Product {i}', description='A product description ' * 5,
+                unit_price=10, inventory=5, collection=collection,
+            )
+        self.url = reverse('products-list')
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(negotiate_encoding('gzip;q=1.0, br;q=0.5'), 'gzip')
+        self.assertEqual(negotiate_encoding('br;q=0, *'), 'gzip')
+        self.assertIsNone(negotiate_encoding('identity'))
+        self.assertIsNone(negotiate_encoding(''))
+
+    def test_brotli_and_gzip(self):
+        plain = self.client.get(self.url).content
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(brotli.decompress(response.content), plain)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain)
+
+    def test_small_bodies_are_not_compressed(self):
+        response = self.client.get(self.url, {'search': 'nothing-matches'}, HTTP_ACCEPT_ENCODING='br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_cached_listing_is_compressed_once(self):
+        self.client.get(self.url, HTTP_ACCEPT_ENCODING='br')
+        with mock.patch('store.middleware.brotli.compress') as compress:
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='br')
+        compress.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(b'Compressed Product', brotli.decompress(response.content))
+
+    def test_weak_etag_still_revalidates(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_streaming_export(self):
+        admin = User.objects.create_superuser(username='zip', password='Zip!23456', email='zip@example.com')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(
+            reverse('products-export'), {'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        lines = brotli.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 10)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class KeysetPaginationTests(TestCase):
+    """Test cursor based pagination of product, order and notification lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.collection = Collection.objects.create(title='Paged Collection')
+        for i in range(25):
+            Product.objects.create(
+                title=f'Product {i:02}', unit_price=i % 3, inventory=1, collection=self.collection
+            )
+        self.url = reverse('products-list')
+
+    def walk(self, params):
+        response = self.client.get(self.url, params)
+        pages = [response.data]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(response.data)
+        return pages
+
+    def test_cursor_pages_cover_all_products_once(self):
+        pages = self.walk({'pagination': 'cursor', 'ordering': 'unit_price'})
+        ids = [product['id'] for page in pages for product in page['results']]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(set(ids), set(Product.objects.values_list('id', flat=True)))
+        prices = [product['unit_price'] for page in pages for product in page['results']]
+        self.assertEqual(prices, sorted(prices))
+        self.assertNotIn('count', pages[0])
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(self.url, {'pagination': 'cursor'}).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 25)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_notifications_cursor_mode(self):
+        user = User.objects.create_user(username='pager', password='pass12345', email='pager@example.com')
+        for i in range(12):
+            Notification.objects.create(user=user, message=f'Message {i}')
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/store/notifications/', {'pagination': 'cursor'})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProductSearchTests(TestCase):
+    """Test full-text product search"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.collection = Collection.objects.create(title='Search Collection')
+        self.in_title = Product.objects.create(
+            title='Red Roses', description='A bunch of flowers', unit_price=5, inventory=1,
+            collection=self.collection
+        )
+        self.in_description = Product.objects.create(
+            title='Garden Vase', description='Fits a dozen roses', unit_price=7, inventory=1,
+            collection=self.collection
+        )
+        Product.objects.create(
+            title='Bread', description='Whole wheat', unit_price=2, inventory=1, collection=self.collection
+        )
+        self.url = reverse('products-list')
+
+    def search(self, term, **params):
+        response = self.client.get(self.url, {'search': term, **params})
+        return [product['id'] for product in response.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        self.assertEqual(self.search('roses'), [self.in_title.id, self.in_description.id])
+
+    def test_search_matches_word_stems(self):
+        self.assertEqual(self.search('flower'), [self.in_title.id])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.search('"roses OR'), [])
+
+    def test_search_index_follows_updates(self):
+        self.in_title.title = 'Red Tulips'
+        self.in_title.save()
+        self.assertEqual(self.search('tulips'), [self.in_title.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title.delete()
+        self.assertEqual(self.search('tulips'), [])
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(
+            self.search('roses', ordering='-unit_price'), [self.in_description.id, self.in_title.id]
+        )
+
+
+class AddCartItemTests(TestCase):
+    """Test adding products to a cart through the single-statement upsert"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='shopper', password='pass12345', email='shopper@example.com')
+        self.client.force_authenticate(user=self.user)
+        self.collection = Collection.objects.create(title='Cart Collection')
+        self.product = Product.objects.create(
+            title='Cart Product', unit_price=3, inventory=5, collection=self.collection
+        )
+        self.cart = Cart.objects.create(user=self.user)
+        self.url = f'/store/carts/{self.cart.uid}/items/'
+
+    def test_add_new_item(self):
+        response = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 2})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        item = CartItem.objects.get(cart=self.cart, product=self.product)
+        self.assertEqual(item.quantity, 2)
+        self.assertEqual(response.data['uid'], str(item.uid))
+
+    def test_adding_again_increments_quantity(self):
+        first = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 2})
+        second = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 3})
+        self.assertEqual(second.data['uid'], first.data['uid'])
+        self.assertEqual(second.data['quantity'], 5)
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 5)
+
+    def test_cannot_exceed_inventory(self):
+        self.client.post(self.url, {'product_id': self.product.id, 'quantity': 4})
+        response = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 4)
+
+    def test_zero_quantity_is_rejected(self):
+        sold_out = Product.objects.create(
+            title='Sold Out Product', unit_price=3, inventory=0, collection=self.collection
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'product_id': sold_out.id, 'quantity': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('quantity', response.data['error']['message'])
+        self.assertFalse(CartItem.objects.exists())
+        self.assertFalse(Notification.objects.filter(user=self.user).exists())
+
+    def test_unknown_product(self):
+        response = self.client.post(self.url, {'product_id': 9999, 'quantity': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_notification_is_sent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {'product_id': self.product.id, 'quantity': 1})
+        self.assertTrue(
+            Notification.objects.filter(user=self.user, message__contains='Cart Product').exists()
+        )
+
+
+class NotificationPipelineTests(TestCase):
+    """Test buffered, batched notification writes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='pass12345', email='buyer@example.com')
+        self.customer = Customer.objects.create(user=self.user, phone='1234567890')
+        self.collection = Collection.objects.create(title='Order Collection')
+        self.products = [
+            Product.objects.create(title=f'Order Product {i}', unit_price=4, inventory=10, collection=self.collection)
+            for i in range(2)
+        ]
+
+    def test_buffered_events_are_written_in_one_insert(self):
+        # One query for the product titles, one bulk INSERT.
+        with self.assertNumQueries(2):
+            with buffered_notifications():
+                with self.captureOnCommitCallbacks(execute=True):
+                    for product in self.products:
+                        notify('Product {product} is back in stock.', user_id=self.user.id, product_id=product.id)
+        messages = sorted(Notification.objects.values_list('message', flat=True))
+        self.assertEqual(messages, [f'Product Order Product {i} is back in stock.' for i in range(2)])
+
+    def test_rolled_back_work_does_not_notify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Cart.objects.create(user=self.user)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertFalse(Notification.objects.exists())
+
+    def test_order_placement_notifies_about_bulk_created_items(self):
+        cart = Cart.objects.create(user=self.user)
+        for product in self.products:
+            CartItem.objects.create(cart=cart, product=product, quantity=1)
+        serializer = CreateOrderSerializer(data={'cart_id': cart.uid}, context={'user_id': self.user.id})
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = serializer.save()
+        messages = set(Notification.objects.filter(user=self.user).values_list('message', flat=True))
+        self.assertIn(f'Your order #{order.pk} has been placed successfully.', messages)
+        self.assertIn('Product Order Product 1 has been added to your order.', messages)
+
+
+class InventoryReservationTests(TestCase):
+    """Test inventory reservation on order placement"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='stock', password='pass12345', email='stock@example.com')
+        self.collection = Collection.objects.create(title='Stock Collection')
+        self.hot = Product.objects.create(title='Hot SKU', unit_price=9, inventory=3, collection=self.collection)
+        self.other = Product.objects.create(title='Other SKU', unit_price=2, inventory=10, collection=self.collection)
+
+    def place_order(self, quantities):
+        cart = Cart.objects.create(user=self.user)
+        for product, quantity in quantities:
+            CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        serializer = CreateOrderSerializer(data={'cart_id': cart.uid}, context={'user_id': self.user.id})
+        serializer.is_valid(raise_exception=True)
+        return cart, serializer.save()
+
+    def test_order_decrements_inventory(self):
+        self.place_order([(self.hot, 2), (self.other, 5)])
+        self.hot.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.hot.inventory, self.other.inventory), (1, 5))
+
+    def test_insufficient_stock_rolls_back_the_order(self):
+        self.place_order([(self.hot, 2)])
+        with self.assertRaises(InsufficientStockError):
+            cart, order = self.place_order([(self.hot, 2), (self.other, 1)])
+        self.hot.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.hot.inventory, self.other.inventory), (1, 10))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_reserve_inventory_aggregates_lines(self):
+        with transaction.atomic():
+            reserve_inventory([(self.hot.id, 1), (self.hot.id, 2)])
+        self.hot.refresh_from_db()
+        self.assertEqual(self.hot.inventory, 0)
+
+
+class OrderQueryCountTests(TestCase):
+    """Test that listing orders costs a constant number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = User.objects.create_superuser(
+            username='orders_admin', password='adminpass123', email='orders_admin@example.com'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        customer_user = User.objects.create_user(username='orderer', password='pass12345', email='orderer@example.com')
+        self.customer = Customer.objects.create(user=customer_user, phone='1234567890')
+        collection = Collection.objects.create(title='Query Collection')
+        self.products = [
+            Product.objects.create(title=f'Query Product {i}', unit_price=i + 1, inventory=10, collection=collection)
+            for i in range(3)
+        ]
+
+    def create_orders(self, count):
+        orders = Order.objects.bulk_create([Order(customer=self.customer) for _ in range(count)])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, unit_price=product.unit_price)
+            for order in orders for product in self.products
+        ])
+
+    def test_list_query_count_is_constant(self):
+        created = 0
+        for count in (1, 10, 100):
+            self.create_orders(count - created)
+            created = count
+            # One query for the orders, one for all items joined with their products.
+            with self.assertNumQueries(2):
+                response = self.client.get('/store/orders/')
+            self.assertEqual(len(response.data), count)
+            titles = {item['product']['title'] for item in response.data[0]['items']}
+            self.assertEqual(titles, {product.title for product in self.products})
+
+    def test_retrieve_query_count(self):
+        self.create_orders(1)
+        order = Order.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/store/orders/{order.id}/')
+        self.assertEqual(len(response.data['items']), 3)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CustomerResolutionTests(TestCase):
+    """Test the cached user -> customer id resolution"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='resolver', password='Resolve!234', email='resolver@example.com')
+
+    def tearDown(self):
+        forget_customer(self.user.id)
+
+    def test_customer_id_is_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer_id = get_customer_id(self.user.id)
+        self.assertEqual(Customer.objects.get(user=self.user).id, customer_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_customer_id(self.user.id), customer_id)
+
+    def test_deleting_customer_clears_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer_id = get_customer_id(self.user.id)
+        Customer.objects.get(pk=customer_id).delete()
+        self.assertIsNone(cache.get(f'store:customer:{self.user.id}'))
+        new_customer_id = get_customer_id(self.user.id)
+        self.assertEqual(Customer.objects.get(user=self.user).id, new_customer_id)
+
+    def login(self):
+        response = self.client.post('/api/auth/login/', {'username': 'resolver', 'password': 'Resolve!234'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return AccessToken(response.data['access'])
+
+    def test_cached_customer_costs_no_lookup(self):
+        token = self.login()
+        self.assertNotIn('customer_id', token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/store/orders/')
+
+        with self.assertNumQueries(1): # orders only, request.user comes from the token
+            response = self.client.get('/store/orders/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_customer_is_recreated(self):
+        self.login()
+        collection = Collection.objects.create(title='Resolver Collection')
+        product = Product.objects.create(title='Resolver Product', unit_price=5, inventory=10, collection=collection)
+        with self.captureOnCommitCallbacks(execute=True):
+            old_customer_id = get_customer_id(self.user.id)
+        Customer.objects.get(pk=old_customer_id).delete()
+
+        response = self.client.get('/store/orders/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_customer = Customer.objects.get(user=self.user)
+        self.assertNotEqual(new_customer.id, old_customer_id)
+
+        # POST is disabled on /store/orders/, so build the context OrderViewSet.create would.
+        customer_id = get_customer_id(self.user.id)
+        self.assertEqual(customer_id, new_customer.id)
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=product, quantity=1)
+        serializer = CreateOrderSerializer(
+            data={'cart_id': cart.uid}, context={'user_id': self.user.id, 'customer_id': customer_id}
+        )
+        serializer.is_valid(raise_exception=True)
+        self.assertEqual(serializer.save().customer_id, new_customer.id)
+
+
+class RendererTests(TestCase):
+    """Test the ujson and MessagePack renderers and parsers"""
+
+    def setUp(self):
+        self.data = {
+            'uid': uuid.uuid4(),
+            'unit_price': Decimal('10.90'),
+            'price_with_tax': Decimal('11.99'),
+            'placed_at': timezone.now(),
+            'url': 'http://testserver/store/products/1/',
+            'title': 'Café  ',
+            'items': [1, 2.5, None, True],
+        }
+
+    def test_ujson_matches_drf_json_renderer(self):
+        self.assertEqual(UJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(
+            UJSONRenderer().render(self.data, 'application/json; indent=4'),
+            JSONRenderer().render(self.data, 'application/json; indent=4'),
+        )
+
+    def test_msgpack_round_trip(self):
+        expected = json.loads(JSONRenderer().render(self.data))
+        payload = MessagePackRenderer().render(self.data)
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(payload)), expected)
+
+    def test_invalid_body_is_parse_error(self):
+        with self.assertRaises(ParseError):
+            UJSONParser().parse(io.BytesIO(b'{'))
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\xc1'))
+
+    def test_msgpack_content_negotiation(self):
+        user = User.objects.create_user(username='packer', password='Packer!234', email='packer@example.com')
+        client = APIClient()
+        client.force_authenticate(user)
+        Collection.objects.create(title='Packed')
+        response = client.get('/store/collections/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)[0]['title'], 'Packed')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FastListParityTests(TestCase):
+    """Test that the .values() list fast path renders exactly what the serializers do"""
+
+    def setUp(self):
+        self.client = APIClient()
+        admin = User.objects.create_superuser(username='parity', password='Parity!234', email='parity@example.com')
+        self.client.force_authenticate(user=admin)
+        customer = Customer.objects.create(user=admin, phone='1234567890')
+        collections = [Collection.objects.create(title=f'Parity Collection {i}') for i in range(2)]
+        products = [
+            Product.objects.create(
+                title=f'Parity Product {i}', slug=f'parity-{i}' if i % 2 else None,
+                description='A fast lamp' if i % 3 else None, unit_price=i * 7 + 3,
+                inventory=i, collection=collections[i % 2],
+            )
+            for i in range(12)
+        ]
+        ProductImages.objects.create(product=products[0], image='media/products/front.jpg')
+        ProductImages.objects.create(product=products[0], image='media/products/back side.jpg')
+        for i in range(3):
+            order = Order.objects.create(customer=customer)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=i + 1, unit_price=Decimal('12.5'))
+                for product in products[i:i + 2]
+            ])
+
+    def assertSameOutput(self, url, params=None, accept='application/json'):
+        responses = []
+        for enabled in (True, False):
+            cache.clear()
+            with override_settings(FAST_LIST_SERIALIZATION=enabled):
+                responses.append(self.client.get(url, params or {}, HTTP_ACCEPT=accept))
+        fast, slow = responses
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_products(self):
+        self.assertSameOutput('/store/products/')
+        self.assertSameOutput('/store/products/', {'page': 2})
+        self.assertSameOutput('/store/products/', {'search': 'lamp', 'ordering': '-unit_price'})
+        response = self.assertSameOutput('/store/products/', {'pagination': 'cursor', 'ordering': 'last_update'})
+        self.assertSameOutput(response.data['next'])
+
+    def test_collections(self):
+        self.assertSameOutput('/store/collections/')
+
+    def test_orders(self):
+        self.assertSameOutput('/store/orders/')
+        self.assertSameOutput('/store/orders/', {'pagination': 'cursor'}, accept='application/msgpack')
+
+    def test_product_list_query_count(self):
+        cache.clear()
+        # Count, product rows joined with collections, images.
+        with self.assertNumQueries(3):
+            self.client.get('/store/products/')
+
+
+class CartTotalsTests(TestCase):
+    """Test that cart totals are computed by the database"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='totals', password='Totals!234', email='totals@example.com')
+        self.client.force_authenticate(user=self.user)
+        self.collection = Collection.objects.create(title='Totals Collection')
+        self.cart = Cart.objects.create(user=self.user)
+        self.url = f'/store/carts/{self.cart.uid}/'
+
+    def add_items(self, start, stop):
+        for i in range(start, stop):
+            product = Product.objects.create(
+                title=f'Totals Product {i}', unit_price=i + 1, inventory=10, collection=self.collection
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def test_empty_cart_total_is_zero(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['total_price'], 0)
+        self.assertEqual(response.data['items'], [])
+
+    def test_totals_and_query_count_do_not_depend_on_item_count(self):
+        added = 0
+        for count in (1, 5, 20):
+            self.add_items(added, count)
+            added = count
+            # The cart with its summed total, then the items joined with their products.
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url)
+            self.assertEqual(response.data['total_price'], sum(2 * (i + 1) for i in range(count)))
+            for item in response.data['items']:
+                self.assertEqual(item['total_price'], item['quantity'] * item['product']['unit_price'])
+
+    def test_list_and_cart_items(self):
+        self.add_items(0, 3)
+        response = self.client.get('/store/carts/')
+        self.assertEqual(response.data[0]['total_price'], 12)
+        response = self.client.get(f'{self.url}items/')
+        self.assertEqual(sorted(item['total_price'] for item in response.data), [2, 4, 6])
+
+    def test_serializer_falls_back_without_annotation(self):
+        self.add_items(0, 2)
+        self.assertEqual(CartSerializer(Cart.objects.get(pk=self.cart.pk)).data['total_price'], 6)
+
+
+class CartOwnershipTests(TestCase):
+    """Test the single-query cart ownership check of the cart item endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(username='owner', password='Owner!234', email='owner@example.com')
+        self.other = User.objects.create_user(username='intruder', password='Intrude!234', email='intruder@example.com')
+        collection = Collection.objects.create(title='Ownership Collection')
+        self.product = Product.objects.create(
+            title='Ownership Product', unit_price=4, inventory=10, collection=collection
+        )
+        self.cart = Cart.objects.create(user=self.owner)
+        self.item = CartItem.objects.create(cart=self.cart, product=self.product, quantity=1)
+        self.url = f'/store/carts/{self.cart.uid}/items/'
+
+    def test_owner_list_costs_two_queries(self):
+        self.client.force_authenticate(user=self.owner)
+        # Ownership EXISTS, then the items with their products.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_owner_can_update_item(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.patch(f'{self.url}{self.item.uid}/', {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 3)
+
+    def test_other_user_is_rejected(self):
+        self.client.force_authenticate(user=self.other)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.delete(f'{self.url}{self.item.uid}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(CartItem.objects.filter(pk=self.item.pk).exists())
+
+    def test_malformed_cart_id_is_rejected(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get('/store/carts/not-a-uuid/items/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BenchmarkConnectionsCommandTests(TestCase):
+    """Test the benchmark_db_connections management command"""
+
+    def test_reports_both_modes(self):
+        out = io.StringIO()
+        call_command('benchmark_db_connections', requests=5, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('new connection per request'))
+        self.assertIn('p50', lines[1])
+
+
+class ImportAuditCommandTests(TestCase):
+    """Test the import_audit management command"""
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   _io\n'
+            'import time:      1500 |       4200 | django.urls\n'
+        )
+        self.assertEqual(parse_importtime(output), [('_io', 120, 120), ('django.urls', 1500, 4200)])
+
+    def test_budget_is_enforced(self):
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('import_audit', budget_ms=0.001, runs=1, top=3, stdout=out)
+        self.assertIn('django.setup() + URLConf', out.getvalue())
+
+
+class StructuredLoggingTests(TestCase):
+    """Test the queued JSON logging handler and custom_logger"""
+
+    def test_queue_handler_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'test.log')
+            handler = QueueLogHandler(filename=filename, console=False)
+            logger = logging.getLogger('store.tests.queue')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                logger.warning('Order %s failed', 42, extra={'order_id': 42})
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+            with open(filename) as file:
+                record = json.loads(file.readline())
+        self.assertEqual(record['message'], 'Order 42 failed')
+        self.assertEqual(record['level'], 'WARNING')
+        self.assertEqual(record['order_id'], 42)
+
+    def test_message_is_rendered_before_queueing(self):
+        handler = QueueLogHandler(console=False)
+        handler.stop()
+        items = ['a']
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = logging.getLogger('store.tests.queue').makeRecord(
+                'store.tests.queue', logging.ERROR, __file__, 1, 'Items %s', (items,), sys.exc_info()
+            )
+        handler.emit(record)
+        items.append('b')
+        queued = handler.queue.get_nowait()
+        handler.close()
+        self.assertEqual((queued.msg, queued.args, queued.exc_info), ("Items ['a']", None, None))
+        self.assertIn('ValueError: boom', json.loads(handler.json_formatter.format(queued))['exc_info'])
+        self.assertIsNotNone(record.exc_info)
+
+    def test_custom_logger_reports_caller(self):
+        with self.assertLogs('store.debug', level='DEBUG') as logs:
+            custom_logger('Retrieved %s products', 3)
+        record = logs.records[0]
+        self.assertEqual(record.getMessage(), 'Retrieved 3 products')
+        self.assertEqual(record.pathname, __file__)
+
+    def test_custom_logger_disabled_level_does_not_log(self):
+        debug_logger = logging.getLogger('store.debug')
+        previous = debug_logger.level
+        debug_logger.setLevel(logging.INFO)
+        try:
+            with mock.patch.object(debug_logger, 'log') as log:
+                custom_logger('Not shown %s', object())
+            log.assert_not_called()
+        finally:
+            debug_logger.setLevel(previous)
+
+
+class CollectionProductsCountTests(TestCase):
+    """Test the maintained Collection.products_count and subtree_products_count"""
+
+    def setUp(self):
+        self.root = Collection.objects.create(title='Counted Root')
+        self.child = Collection.objects.create(title='Counted Child', parent=self.root)
+        self.other = Collection.objects.create(title='Counted Other')
+
+    def assertCounts(self, collection, count, subtree_count):
+        collection.refresh_from_db()
+        self.assertEqual((collection.products_count, collection.subtree_products_count), (count, subtree_count))
+
+    def create_product(self, title, collection):
+        return Product.objects.create(title=title, unit_price=10, inventory=1, collection=collection)
+
+    def test_create_rolls_up_to_ancestors(self):
+        self.create_product('Counted A', self.child)
+        self.create_product('Counted B', self.root)
+        self.assertCounts(self.child, 1, 1)
+        self.assertCounts(self.root, 1, 2)
+        self.assertCounts(self.other, 0, 0)
+
+    def test_change_collection_and_delete(self):
+        product = self.create_product('Counted A', self.child)
+        product.collection = self.other
+        product.save()
+        product.save() # saving again without a change must not count twice
+        self.assertCounts(self.child, 0, 0)
+        self.assertCounts(self.root, 0, 0)
+        self.assertCounts(self.other, 1, 1)
+
+        Product.objects.get(pk=product.pk).delete()
+        self.assertCounts(self.other, 0, 0)
+
+    def test_moving_a_collection_moves_its_subtree_count(self):
+        self.create_product('Counted A', self.child)
+        self.child.title = 'Moved Child' # Collection.save rejects its own unchanged title
+        self.child.parent = self.other
+        self.child.save()
+        self.assertCounts(self.root, 0, 0)
+        self.assertCounts(self.other, 0, 1)
+        self.assertCounts(self.child, 1, 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        self.create_product('Counted A', self.child)
+        Collection.objects.filter(pk=self.root.pk).update(products_count=5, subtree_products_count=0)
+        out = io.StringIO()
+        call_command('reconcile_collection_counts', stdout=out)
+        self.assertIn(f'collection {self.root.pk}: products_count 5 -> 0', out.getvalue())
+        self.assertCounts(self.root, 0, 1)
+        call_command('reconcile_collection_counts', stdout=out)
+        self.assertIn('Fixed 0 drifted collections.', out.getvalue())
+
+    def test_listing_does_not_aggregate_products(self):
+        self.create_product('Counted A', self.child)
+        with self.assertNumQueries(1):
+            response = APIClient().get('/store/collections/')
+        counts = {row['title']: row['products_count'] for row in response.data}
+        self.assertEqual(counts, {'Counted Root': 0, 'Counted Child': 1, 'Counted Other': 0})
+
+
+class CollectionTreeTests(TestCase):
+    """Test the cached /store/collections/tree/ endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.root = Collection.objects.create(title='Tree Root')
+        self.child = Collection.objects.create(title='Tree Child', parent=self.root)
+        self.leaf = Collection.objects.create(title='Tree Leaf', parent=self.child)
+        Collection.objects.create(title='Tree Other')
+        Product.objects.create(title='Tree Product', unit_price=10, inventory=1, collection=self.leaf)
+
+    def test_tree_is_nested_with_subtree_counts(self):
+        response = self.client.get('/store/collections/tree/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Siblings are ordered by title (MPTTMeta.order_insertion_by).
+        self.assertEqual([node['title'] for node in response.data], ['Tree Other', 'Tree Root'])
+        root = response.data[1]
+        self.assertEqual(root['subtree_products_count'], 1)
+        self.assertEqual(root['products_count'], 0)
+        leaf = root['children'][0]['children'][0]
+        self.assertEqual(leaf['title'], 'Tree Leaf')
+        self.assertEqual(leaf['children'], [])
+        self.assertTrue(leaf['products_link'].endswith(f'/store/products/?collection_id={self.leaf.pk}'))
+
+    def test_tree_is_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            first = self.client.get('/store/collections/tree/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/store/collections/tree/')
+        self.assertEqual(first.data, second.data)
+
+    def test_tree_mutation_invalidates_cache(self):
+        self.client.get('/store/collections/tree/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Collection.objects.create(title='Tree New', parent=self.root)
+        response = self.client.get('/store/collections/tree/')
+        self.assertIn('Tree New', [node['title'] for node in response.data[1]['children']])
+
+
+class CollectionSubtreeFilterTests(TestCase):
+    """Test the collection_subtree product filter"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.root = Collection.objects.create(title='Subtree Root')
+        child = Collection.objects.create(title='Subtree Child', parent=self.root)
+        leaf = Collection.objects.create(title='Subtree Leaf', parent=child)
+        other = Collection.objects.create(title='Subtree Other')
+        for title, collection, price in [
+            ('Root Lamp', self.root, 10), ('Child Lamp', child, 20), ('Leaf Lamp', leaf, 30), ('Other Lamp', other, 40),
+        ]:
+            Product.objects.create(title=title, unit_price=price, inventory=1, collection=collection)
+        self.leaf = leaf
+
+    def titles(self, params):
+        response = self.client.get('/store/products/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product['title'] for product in response.data['results']]
+
+    def test_subtree_includes_descendants(self):
+        self.assertEqual(self.titles({'collection_subtree': self.root.pk}), ['Child Lamp', 'Leaf Lamp', 'Root Lamp'])
+        self.assertEqual(self.titles({'collection_subtree': self.leaf.pk}), ['Leaf Lamp'])
+
+    def test_subtree_with_price_range(self):
+        params = {'collection_subtree': self.root.pk, 'unit_price__gt': 15, 'ordering': '-unit_price'}
+        self.assertEqual(self.titles(params), ['Leaf Lamp', 'Child Lamp'])
+
+    def test_unknown_collection_is_empty(self):
+        self.assertEqual(self.titles({'collection_subtree': 999999}), [])
+
+
+class ProductImportTests(TestCase):
+    """Test the import_products command and POST /store/products/bulk/"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(username='importer', password='Import!234', email='import@example.com')
+        self.lamps = Collection.objects.create(title='Import Lamps')
+        self.chairs = Collection.objects.create(title='Import Chairs')
+        Product.objects.create(title='Old Lamp', unit_price=5, inventory=1, collection=self.lamps)
+
+    def test_csv_upsert_with_batches_and_errors(self):
+        body = (
+            'title,description,unit_price,inventory,collection\n'
+            'Old Lamp,"Now a chair,\nwith two lines",7,3,Import Chairs\n'
+            'New Lamp,,12,4,Import Lamps\n'
+            'Bad Price,,cheap,1,Import Lamps\n'
+            'Lost Lamp,,1,1,Nowhere\n'
+            'Newer Lamp,,15,2,Import Lamps\n'
+        )
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(body)
+        self.addCleanup(os.remove, file.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_products', file.name, batch_size=2, stdout=out, stderr=err)
+
+        self.assertIn('Created 2, updated 1, skipped 2 invalid products.', out.getvalue())
+        self.assertIn("line 5: unit_price must be a whole number, got 'cheap'.", err.getvalue())
+        self.assertIn("Unknown collection 'Nowhere'.", err.getvalue())
+        old = Product.objects.get(title='Old Lamp')
+        self.assertEqual((old.collection_id, old.unit_price, old.description), (self.chairs.pk, 7, 'Now a chair,\nwith two lines'))
+        self.assertEqual(Product.objects.get(title='New Lamp').slug, 'new-lamp')
+        self.lamps.refresh_from_db()
+        self.chairs.refresh_from_db()
+        self.assertEqual((self.lamps.products_count, self.chairs.products_count), (2, 1))
+
+    def test_bulk_endpoint_ndjson(self):
+        self.client.force_authenticate(user=self.admin)
+        body = '\n'.join([
+            json.dumps({'title': 'Json Lamp', 'unit_price': 9, 'inventory': 2, 'collection_id': self.lamps.pk}),
+            '{not json',
+            json.dumps({'title': 'Json Chair', 'unit_price': 3, 'inventory': 1, 'collection': 'Import Chairs'}),
+        ])
+        response = self.client.generic('POST', '/store/products/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['invalid']), (2, 0, 1))
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+        self.assertTrue(Product.objects.filter(title='Json Chair', collection=self.chairs).exists())
+
+    def test_bulk_endpoint_multipart_and_permissions(self):
+        upload = io.BytesIO(b'title,unit_price,inventory,collection\nForm Lamp,4,1,Import Lamps\n')
+        upload.name = 'products.csv'
+        response = self.client.post('/store/products/bulk/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        upload.seek(0)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/store/products/bulk/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+
+    def test_bulk_endpoint_rejects_other_formats(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/store/products/bulk/', {'title': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+class ExportTests(TestCase):
+    """Test the streaming product and order exports"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(username='exporter', password='Export!234', email='export@example.com')
+        collection = Collection.objects.create(title='Export Collection')
+        self.products = [
+            Product.objects.create(title=f'Export Product {i}', unit_price=i + 1, inventory=i, collection=collection)
+            for i in range(5)
+        ]
+        ProductImages.objects.create(product=self.products[0], image='media/products/export.jpg')
+        customer = Customer.objects.create(user=self.admin, phone='1234567890')
+        self.order = Order.objects.create(customer=customer)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=self.order, product=product, quantity=2, unit_price=Decimal('1.50'))
+            for product in self.products[:2]
+        ])
+        Order.objects.create(customer=customer)
+
+    def get_export(self, url, params=None, **extra):
+        response = self.client.get(url, params or {}, **extra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_product_ndjson_in_constant_chunks(self):
+        self.client.force_authenticate(user=self.admin)
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/store/products/export/')
+            # One cursor read in three chunks, plus one images query per chunk.
+            with self.assertNumQueries(4):
+                body = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([record['id'] for record in records], [product.pk for product in self.products])
+        self.assertEqual(records[0]['collection_title'], 'Export Collection')
+        self.assertTrue(records[0]['images'][0].endswith('media/products/export.jpg'))
+
+    def test_product_csv_with_range_filter(self):
+        self.client.force_authenticate(user=self.admin)
+        Product.objects.filter(pk=self.products[0].pk).update(last_update=timezone.now() - timezone.timedelta(days=3))
+        since = (timezone.now() - timezone.timedelta(days=1)).isoformat()
+        response, body = self.get_export('/store/products/export/', {'format': 'csv', 'last_update__gte': since})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="products.csv"')
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'id,title,slug,description,unit_price,inventory,last_update,collection_id,collection_title,images')
+        self.assertEqual(len(lines), 5)
+
+    def test_product_export_is_admin_only_and_validates_filters(self):
+        self.assertEqual(self.client.get('/store/products/export/').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/store/products/export/', {'last_update__gte': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('last_update__gte', json.loads(response.content)['error']['message'])
+
+    def test_order_csv_has_a_line_per_item(self):
+        self.client.force_authenticate(user=self.admin)
+        _, body = self.get_export('/store/orders/export/', HTTP_ACCEPT='text/csv')
+        lines = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(lines[0][-4:], ['product_id', 'product_title', 'quantity', 'unit_price'])
+        self.assertEqual([line[0] for line in lines[1:]], [str(self.order.pk)] * 2 + [str(self.order.pk + 1)])
+        self.assertEqual(lines[1][-2:], ['2', '1.50'])
+
+    def test_order_export_is_scoped_to_the_customer(self):
+        other = User.objects.create_user(username='other-exporter', password='Export!234', email='other@example.com')
+        Customer.objects.create(user=other, phone='0987654321')
+        self.client.force_authenticate(user=other)
+        _, body = self.get_export('/store/orders/export/', {'format': 'ndjson'})
+        self.assertEqual(body, '')
+
+
+class BulkStockUpdateTests(TestCase):
+    """Test POST /store/products/bulk-update/ and bulk_update_stock"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(username='restocker', password='Stock!234', email='stock@example.com')
+        collection = Collection.objects.create(title='Restock Collection')
+        self.products = [
+            Product.objects.create(title=f'Restock {i}', unit_price=10, inventory=5, collection=collection)
+            for i in range(3)
+        ]
+
+    def test_results_per_entry(self):
+        a, b, c = (product.pk for product in self.products)
+        results = bulk_update_stock([
+            {'id': a, 'inventory_delta': 7},
+            {'id': b, 'inventory': 0, 'unit_price': 25},
+            {'id': c, 'inventory_delta': -6},
+            {'id': 999999, 'inventory': 1},
+            {'id': a, 'inventory': 1},
+            {'id': c, 'inventory': -1},
+            {'id': c},
+        ], chunk_size=2)
+        self.assertEqual(results[0], {'id': a, 'status': 'updated', 'inventory': 12, 'unit_price': 10})
+        self.assertEqual(results[1], {'id': b, 'status': 'updated', 'inventory': 0, 'unit_price': 25})
+        self.assertEqual([result.get('error') for result in results[2:]], [
+            'Inventory can not be negative.', 'Product not found.', 'Duplicate id.',
+            'Inventory can not be negative.', 'Nothing to update: give inventory, inventory_delta or unit_price.',
+        ])
+        self.products[2].refresh_from_db()
+        self.assertEqual(self.products[2].inventory, 5)
+
+    def test_delta_past_integer_range_fails_only_that_entry(self):
+        a, b, _ = (product.pk for product in self.products)
+        Product.objects.filter(pk=a).update(inventory=MAX_INVENTORY - 10)
+        results = bulk_update_stock([
+            {'id': a, 'inventory_delta': MAX_INVENTORY},
+            {'id': b, 'inventory_delta': 1},
+        ])
+        self.assertEqual(results[0], {'id': a, 'status': 'error', 'error': 'Inventory is too large.'})
+        self.assertEqual(results[1]['inventory'], 6)
+        self.assertEqual(Product.objects.get(pk=a).inventory, MAX_INVENTORY - 10)
+
+    def test_one_update_per_chunk(self):
+        entries = [{'id': product.pk, 'inventory_delta': 1} for product in self.products]
+        # Two UPDATE ... RETURNING statements, each in its own savepoint pair.
+        with self.assertNumQueries(6):
+            bulk_update_stock(entries, chunk_size=2)
+        self.assertEqual(sorted(Product.objects.values_list('inventory', flat=True)), [6, 6, 6])
+
+    def test_endpoint_is_admin_only(self):
+        url = '/store/products/bulk-update/'
+        body = [{'id': self.products[0].pk, 'inventory_delta': 3}]
+        self.assertEqual(self.client.post(url, body, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(url, {'products': body}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['updated'], response.data['failed']), (1, 0))
+        self.assertEqual(response.data['results'][0]['inventory'], 8)
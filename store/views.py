@@ -1,14 +1,13 @@
-from typing import override
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
+from django.db.models import Prefetch
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from colorama import Fore
-from httpx import get
 
 from core.models import User
-from store.test_tools.tools import custom_logger
-from .permissions import IsAdminOrReadOnly, FullDjangoModelPermissions, IsCartItemOwner, IsCartOwner, ViewCustomerHistoryPermission, NotificationsPermission
+from .permissions import IsAdminOrReadOnly, FullDjangoModelPermissions, IsCartItemOwner, IsCartOwner, ViewCustomerHistoryPermission, NotificationsPermission, \
+    owns_cart
 from rest_framework import status, serializers
 from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions, IsAdminUser, AllowAny
 from rest_framework.decorators import action, api_view
@@ -16,7 +15,7 @@ from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin, DestroyModelMixin, ListModelMixin, UpdateModelMixin
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import ParseError, PermissionDenied
 from .models import Product, Collection, OrderItem, Review, Cart, \
     CartItem, Customer, Order, Notification, ProductImages
 
@@ -24,9 +23,19 @@ from .serializer import ProductSerializer,\
     CollectionSerializer, ReviewSerializer, CartSerializer,\
     CartItemSerializer, AddCartItemSerializer, UpdateCartItemSerializer,\
     UserProfileSerializer, OrderListSerializer, UserNotificationsSerializer, \
-    CreateOrderSerializer, UpdateOrderSerializer, ProductImageSerializer
-from .filters import ProductFilter
-from .pagination import DefaultPagination
+    CreateOrderSerializer, UpdateOrderSerializer, ProductImageSerializer, \
+    CollectionTreeSerializer, with_cart_totals, with_item_totals
+from .filters import ProductFilter, ProductExportFilter, OrderExportFilter
+from .pagination import DefaultOrKeysetPagination, KeysetPagination
+from .cache import CatalogCacheMixin, build_catalog_cache_key, get_catalog_version
+from .conditional import ConditionalGetMixin, catalog_validators, get_cart_version, make_etag
+from .fastpath import FastListMixin, ProductRowSerializer, CollectionRowSerializer, OrderRowSerializer
+from .search import ProductSearchFilter
+from .importer import ProductImporter, detect_format, read_rows
+from .exports import ProductExport, OrderExport
+from .renderers import CSVRenderer, NDJSONRenderer
+from .customers import get_customer_id, forget_customer
+from .inventory import bulk_update_stock
 from rest_framework.viewsets import ModelViewSet
 from django.contrib.auth import get_user_model
 from .exceptions import InvalidOrderException, ProductNotFoundError, CollectionNotFoundError, \
@@ -35,18 +44,36 @@ from .exceptions import InvalidOrderException, ProductNotFoundError, CollectionN
 # User = get_user_model()
 
 
-class ProductViewset(ModelViewSet):
+def filter_export(filterset_class, request, queryset):
+    """
+    Applies an export FilterSet to `queryset`.
+
+    Raises:
+        ValidationError: If a filter value is invalid, e.g. a malformed date.
+    """
+    filterset = filterset_class(request.query_params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        raise serializers.ValidationError(filterset.errors)
+    return filterset.qs
+
+
+class ProductViewset(ConditionalGetMixin, CatalogCacheMixin, FastListMixin, ModelViewSet):
     """
     A viewset for managing product operations in the store.
 
     This viewset provides CRUD operations for Product models with additional features:
-    - Filtering products by collection, price range, and other attributes
-    - Searching products by title and description 
+    - Filtering products by collection (or a collection and its sub-collections), price range,
+      and other attributes
+    - Full-text search over title and description, ranked by relevance
     - Ordering products by price and last update date
-    - Pagination support
+    - Page-number pagination, or keyset pagination with ?pagination=cursor
     - Image management for products
+    - Read-through caching of list/retrieve responses
+    - ETag/Last-Modified validators on list/retrieve, answering 304 Not Modified
+    - Serializer-free list rendering from .values() rows (see store.fastpath)
     - Inventory validation
     - Protection against deleting products with existing orders
+    - Bulk CSV/NDJSON import
 
     Endpoints:
         GET /products/ - List all products with optional filters
@@ -54,29 +81,38 @@ class ProductViewset(ModelViewSet):
         GET /products/{id}/ - Retrieve a specific product
         PUT/PATCH /products/{id}/ - Update a product (admin only)
         DELETE /products/{id}/ - Delete a product (admin only)
+        POST /products/bulk/ - Import products from CSV or NDJSON (admin only)
 
     Attributes:
-        filter_backends (list): Configures DjangoFilterBackend for filtering, SearchFilter 
-            for search, and OrderingFilter for sorting results
+        filter_backends (list): Configures DjangoFilterBackend for filtering, ProductSearchFilter
+            for full-text search, and OrderingFilter for sorting results
         permission_classes (list): [IsAdminOrReadOnly] - Allow read access to all users 
             but restrict create/update/delete to admin users
-        search_fields (list): Fields that can be searched ('title', 'description')
+        search_fields (list): Fields searched with icontains on databases without a
+            full-text index ('title', 'description')
         ordering_fields (list): Fields that can be used for sorting results
         filterset_class (ProductFilter): Custom filter class for advanced filtering
-        pagination_class (DefaultPagination): Handles result pagination
+        pagination_class (DefaultOrKeysetPagination): Handles result pagination
         serializer_class (ProductSerializer): Handles product data serialization
+        row_serializer_class (ProductRowSerializer): Renders list rows without the serializer
+        cache_key_params (list): Query parameters that vary the cached response
     """
     # queryset = Product.objects.prefetch_related('images').all() # To decrease the number of queries of the database, grab images of each product.
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, OrderingFilter]
     permission_classes = [IsAdminOrReadOnly] # IsAuthenticated
 
     search_fields = ['title', 'description']
-    ordering_fields = ['unit_price', 'last_update']
+    ordering_fields = ['title', 'unit_price', 'last_update']
 
     filterset_class = ProductFilter
-    pagination_class = DefaultPagination
+    pagination_class = DefaultOrKeysetPagination
     serializer_class = ProductSerializer
+    row_serializer_class = ProductRowSerializer
+    cache_key_params = [
+        'collection_id', 'collection_subtree', 'unit_price__gt', 'unit_price__lt', 'search', 'ordering',
+        'page', 'cursor', 'pagination',
+    ]
 
     def get_queryset(self):
         """
@@ -100,6 +136,21 @@ class ProductViewset(ModelViewSet):
             queryset = queryset.filter(collection_id=collection_id)
         return queryset
     
+    def get_validators(self):
+        """
+        Returns the ETag and Last-Modified of a product list or product.
+
+        Both come from the catalog version (see store.conditional), so a
+        304 costs no query.
+
+        Returns:
+            tuple: (etag, last_modified)
+        """
+        return catalog_validators(
+            self.request, self.action, self.cache_key_params,
+            self.kwargs.get(self.lookup_url_kwarg or self.lookup_field, ''),
+        )
+
     def get_serializer_context(self):
         """
         Returns the context dictionary that will be passed to the serializer.
@@ -164,9 +215,86 @@ class ProductViewset(ModelViewSet):
         if 'unit_price' in data and data['unit_price'] < 0:
             raise InvalidInventoryError("Unit price can not be negative.")
         return super().update(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk(self, request):
+        """
+        Imports products from a CSV or NDJSON upload, upserting on title.
+
+        The body is either the raw file (Content-Type text/csv or
+        application/x-ndjson) or a multipart form with a `file` field. It is
+        read line by line and written in batches (see store/importer.py).
+        Invalid rows are skipped and reported.
+
+        Args:
+            request (Request): The request object.
+
+        Returns:
+            Response: created, updated and invalid counts and the row errors.
+
+        Raises:
+            UnsupportedImportFormatError: If the upload is neither CSV nor NDJSON.
+
+        Example:
+            POST /store/products/bulk/ with Content-Type: text/csv
+        """
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ParseError('Upload the products as the `file` field.')
+            fmt, lines = detect_format(upload.name), upload
+        else:
+            fmt, lines = detect_format(request.content_type), request.stream or []
+        return Response(ProductImporter().run(read_rows(lines, fmt)))
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', permission_classes=[IsAdminUser])
+    def bulk_update(self, request):
+        """
+        Sets or adjusts inventory and prices of many products in set-based UPDATEs.
+
+        The body is a list (or {"products": [...]}) of
+        {"id", "inventory" | "inventory_delta", "unit_price"} entries.
+        Valid entries are applied even when others fail; every entry gets a
+        result (see store.inventory.bulk_update_stock).
+
+        Args:
+            request (Request): The request object.
+
+        Returns:
+            Response: updated and failed counts, and the per-entry results in request order.
+
+        Example:
+            POST /store/products/bulk-update/ [{"id": 1, "inventory_delta": 20}, {"id": 2, "unit_price": 15}]
+        """
+        entries = request.data.get('products') if isinstance(request.data, dict) else request.data
+        if not isinstance(entries, list):
+            raise serializers.ValidationError({'products': 'Expected a list of products.'})
+        results = bulk_update_stock(entries)
+        updated = sum(result['status'] == 'updated' for result in results)
+        return Response({'updated': updated, 'failed': len(results) - updated, 'results': results})
+
+    @action(detail=False, permission_classes=[IsAdminUser], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Streams every product as NDJSON or CSV, with collection title and image URLs.
+
+        The format comes from the Accept header or ?format=csv|ndjson (NDJSON
+        by default). Accepts the list filters plus last_update__gte/__lt.
+
+        Args:
+            request (Request): The request object.
+
+        Returns:
+            StreamingHttpResponse: The export, as an attachment.
+
+        Example:
+            GET /store/products/export/?format=csv&last_update__gte=2024-01-01
+        """
+        queryset = filter_export(ProductExportFilter, request, Product.objects.order_by('pk'))
+        return ProductExport(request, queryset).response(request.accepted_renderer.format)
     
 
-class CollectionViewSet(ModelViewSet):
+class CollectionViewSet(ConditionalGetMixin, FastListMixin, ModelViewSet):
     """
     A viewset for performing CRUD operations on Collection instances.
 
@@ -177,16 +305,36 @@ class CollectionViewSet(ModelViewSet):
     Attributes:
         queryset (QuerySet): The queryset for this viewset.
         serializer_class (class): The serializer class to use for this viewset.
+        row_serializer_class (class): Renders the list without the serializer.
         permission_classes (list): A list of permission classes to use for this viewset.
 
     Methods:
         create: Handles the creation of a collection instance.
         destroy: Handles the deletion of a collection instance.
+        tree: Returns the whole collection hierarchy.
+        get_validators: ETag/Last-Modified for list, retrieve and tree.
     """
-    queryset = Collection.objects.annotate(products_count=Count('products')).all()
+    queryset = Collection.objects.all() # products_count is a maintained column, see store.counters
     serializer_class = CollectionSerializer
+    row_serializer_class = CollectionRowSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    conditional_actions = ('list', 'retrieve', 'tree')
+
+    def get_validators(self):
+        """
+        Returns the ETag and Last-Modified of collection reads.
+
+        Collections have no timestamp of their own, but every collection or
+        product change bumps the catalog version (see store.conditional).
+
+        Returns:
+            tuple: (etag, last_modified)
+        """
+        return catalog_validators(
+            self.request, self.action, list(self.request.query_params), self.kwargs.get('pk', '')
+        )
+
     def create(self, request, *args, **kwargs):
         """
         Handles the creation of a collection instance.
@@ -216,13 +364,44 @@ class CollectionViewSet(ModelViewSet):
             Response: The response object.
         """
         collection = get_object_or_404(Collection, pk=kwargs['pk'])
-        products_count = Product.objects.filter(collection=collection).count() > 0
-        if products_count:
+        if Product.objects.filter(collection=collection).exists():
             return Response({'error':'can not delete because there is products associated with this collection'},
                         status=status.HTTP_409_CONFLICT
                         )
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=False)
+    def tree(self, request):
+        """
+        Returns every collection nested under its parent, with product counts.
+
+        The tree is built from one query with get_cached_trees() and the
+        serialized result is cached under the catalog version, which any
+        collection or product change bumps (see store/cache.py). Supports
+        conditional GETs like list and retrieve.
+
+        Args:
+            request (Request): The request object.
+
+        Returns:
+            Response: A list of root collections, each with nested `children`.
+
+        Example:
+            GET /store/collections/tree/
+        """
+        return self.conditional_response(lambda: self.get_tree_response(request))
+
+    def get_tree_response(self, request):
+        key = build_catalog_cache_key('collection-tree', request, [])
+        data = cache.get(key)
+        if data is None:
+            roots = Collection.objects.all().get_cached_trees()
+            data = CollectionTreeSerializer(roots, many=True, context={'request': request}).data
+            cache.set(key, data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        response = Response(data)
+        response.compression_cache = (key, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        return response
+
 
 class ReviewViewSet(ModelViewSet):
     """
@@ -277,7 +456,7 @@ class ReviewViewSet(ModelViewSet):
             Response: The response object.
         """
         review = self.get_object()
-        if not review.user == self.request.user:
+        if not review.user_id == self.request.user.id:
             raise serializers.ValidationError({'detail': 'You do not have permission to update this review.'}, status=403)
     
     def destroy(self, request, *args, **kwargs):
@@ -293,7 +472,7 @@ class ReviewViewSet(ModelViewSet):
             Response: The response object.
         """
         review = self.get_object()
-        if not review.user == self.request.user or not request.user.is_staff:
+        if not review.user_id == self.request.user.id or not request.user.is_staff:
             raise serializers.ValidationError({'detail': 'You do not have permission to delete this review.'}, status=403)
         return super().destroy(request, *args, **kwargs)
 
@@ -313,14 +492,14 @@ class ReviewViewSet(ModelViewSet):
         product = get_object_or_404(Product, pk=product_id)
 
         # Check for existing review by the user
-        if Review.objects.filter(product=product, user=self.request.user).exists():
+        if Review.objects.filter(product=product, user_id=self.request.user.id).exists():
             raise DuplicateReviewError(
                 detail="You have already left a review for this product.",
             )
-        serializer.save(user=self.request.user, product=product)
+        serializer.save(user_id=self.request.user.id, product=product)
 
 
-class CartViewSet(CreateModelMixin, DestroyModelMixin,
+class CartViewSet(ConditionalGetMixin, CreateModelMixin, DestroyModelMixin,
                 RetrieveModelMixin, GenericViewSet, ListModelMixin):
     
     queryset = Cart.objects.prefetch_related('items__product').all()
@@ -328,8 +507,26 @@ class CartViewSet(CreateModelMixin, DestroyModelMixin,
     permission_classes = [IsAuthenticated]  # Allow any authenticated user
 
     def get_queryset(self):
-        # Only return carts belonging to the current user
-        return Cart.objects.prefetch_related('items__product').filter(user=self.request.user)
+        # Only return carts belonging to the current user.
+        # Totals are summed by the database and items come with their product in
+        # one query, so a cart costs the same number of queries whatever its size.
+        items = with_item_totals(CartItem.objects.select_related('product'))
+        return with_cart_totals(
+            Cart.objects.filter(user_id=self.request.user.id)
+        ).prefetch_related(Prefetch('items', queryset=items))
+
+    conditional_actions = ('retrieve',)
+    cache_control = {'private': True, 'no_cache': True}
+
+    def get_validators(self):
+        # The cart version changes with every item write, the catalog version
+        # with product prices. The user id keeps other users from matching.
+        # Item changes don't touch Cart.last_activity, so there is no Last-Modified.
+        etag = make_etag(
+            self.request.build_absolute_uri(), self.request.user.id,
+            get_cart_version(self.kwargs['pk']), get_catalog_version(),
+        )
+        return etag, None
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'user': request.user})
@@ -339,7 +536,7 @@ class CartViewSet(CreateModelMixin, DestroyModelMixin,
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
  
 class CartItemViewSet(ModelViewSet):
     """
@@ -357,7 +554,7 @@ class CartItemViewSet(ModelViewSet):
         get_queryset: Returns the queryset for this viewset.
     """
     http_method_names = ['get', 'post', 'patch', 'delete']
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, IsCartItemOwner]
     
     def get_serializer_class(self):
         """
@@ -385,29 +582,20 @@ class CartItemViewSet(ModelViewSet):
         """
         Returns the queryset for this viewset.
 
+        Cart ownership was already checked by IsCartItemOwner (see
+        permissions.owns_cart), so the cart itself is never loaded.
+
         Returns:
             QuerySet: The queryset for this viewset.
         """
         cart_id = self.kwargs['cart_pk']
-        # Verify that the cart belongs to current user
-        cart = get_object_or_404(Cart, pk=cart_id, user=self.request.user)
-        return CartItem.objects.filter(cart_id=cart_id).select_related('product')
-    
-    def get_cart(self):
-        """
-        Returns the cart for this viewset.
-        """
-        cart_id = self.kwargs['cart_pk']
-        cart = get_object_or_404(Cart, pk=cart_id)
-
-        # Check cart's ownership
-        if cart.user != self.request.user and not self.request.user.is_staff:
-            raise PermissionDenied("You do not have permission to access this cart.")
-        return cart
+        if not owns_cart(self.request, self):
+            return CartItem.objects.none()
+        return with_item_totals(CartItem.objects.filter(cart_id=cart_id).select_related('product'))
     
     def perform_create(self, serializer):
-        cart = self.get_cart()
-        serializer.save(cart=cart)
+        # AddCartItemSerializer writes by cart_id from the context, ownership is already checked.
+        serializer.save()
 
 
 class CustomViewSet(ModelViewSet):
@@ -454,9 +642,12 @@ class CustomViewSet(ModelViewSet):
         Returns:
             Response: The response object.
         """
-        customer, is_created = Customer.objects.get_or_create(user_id=request.user.id)
         if not request.user.is_authenticated:
             return Response({"detail": "Authentication credentials were not provided."}, status=401)
+        customer = Customer.objects.filter(pk=get_customer_id(request.user.id)).first()
+        if customer is None: # cached id of a deleted customer
+            forget_customer(request.user.id)
+            customer, is_created = Customer.objects.get_or_create(user_id=request.user.id)
         if request.method == 'GET':
             serializer = UserProfileSerializer(customer)
             return Response(serializer.data)
@@ -466,7 +657,7 @@ class CustomViewSet(ModelViewSet):
             serializer.save()
             return Response(serializer.data)
 
-class OrderViewSet(ModelViewSet):
+class OrderViewSet(FastListMixin, ModelViewSet):
     """
     A viewset for viewing and editing order instances.
 
@@ -475,6 +666,9 @@ class OrderViewSet(ModelViewSet):
     Attributes:
         http_method_names (list): A list of HTTP methods to use for this viewset.
         permission_classes (list): A list of permission classes to use for this viewset.
+        pagination_class (KeysetPagination): Keyset pagination on ?pagination=cursor,
+            newest orders first; unpaginated otherwise.
+        row_serializer_class (class): Renders the list without the serializer.
 
     Methods:
         get_permissions: Returns the permission classes for this viewset.
@@ -483,6 +677,9 @@ class OrderViewSet(ModelViewSet):
         get_queryset: Returns the queryset for this viewset.
     """
     http_method_names = ['get', 'patch', 'delete', 'head', 'options']
+    pagination_class = KeysetPagination
+    keyset_ordering = ['-placed_at']
+    row_serializer_class = OrderRowSerializer
 
     def get_permissions(self):
         """
@@ -510,7 +707,8 @@ class OrderViewSet(ModelViewSet):
         serializer = CreateOrderSerializer(
             data=request.data,
             context = {
-                'user_id': self.request.user.id
+                'user_id': self.request.user.id,
+                'customer_id': get_customer_id(self.request.user.id),
                 }
             )
         
@@ -534,18 +732,47 @@ class OrderViewSet(ModelViewSet):
  
     def get_queryset(self):
         """
-        Returns the queryset for this viewset.
+        Returns the queryset for this viewset, with order items and their
+        products prefetched so listing costs a fixed number of queries.
 
         Returns:
             QuerySet: The queryset for this viewset.
         """
         current_user = self.request.user
+        queryset = Order.objects.prefetch_related(
+            # One query for all items and their products, loading only the
+            # product columns SimpleProductSerializer renders.
+            Prefetch('items', queryset=OrderItem.objects.select_related('product').only(
+                'id', 'order_id', 'product_id', 'quantity', 'unit_price',
+                'product__id', 'product__title', 'product__unit_price',
+            ))
+        )
         if current_user.is_staff:
-            return Order.objects.all()
+            return queryset
         
-        # customer_id is not included in the json web token and we have to calculate it from user id:
-        customer_id, created = Customer.objects.only('id').get_or_create(user_id=current_user.id)
-        return Order.objects.filter(customer_id=customer_id)
+        # customer_id comes from the customer cache (see store.customers):
+        return queryset.filter(customer_id=get_customer_id(current_user.id))
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Streams the orders visible to the user as NDJSON or CSV, with their items.
+
+        Staff get every order, customers their own (see get_queryset). The
+        format comes from the Accept header or ?format=csv|ndjson. Filters:
+        placed_at__gte, placed_at__lt and payment_status.
+
+        Args:
+            request (Request): The request object.
+
+        Returns:
+            StreamingHttpResponse: The export, as an attachment; CSV has one line per item.
+
+        Example:
+            GET /store/orders/export/?placed_at__gte=2024-01-01&placed_at__lt=2024-02-01
+        """
+        queryset = filter_export(OrderExportFilter, request, self.get_queryset().order_by('pk'))
+        return OrderExport(request, queryset).response(request.accepted_renderer.format)
 
 class NotificationViewSet(ModelViewSet):
     """
@@ -556,6 +783,8 @@ class NotificationViewSet(ModelViewSet):
     Attributes:
         serializer_class (class): The serializer class to use for this viewset.
         permission_classes (list): A list of permission classes to use for this viewset.
+        pagination_class (KeysetPagination): Keyset pagination on ?pagination=cursor,
+            ordered by created_at; unpaginated otherwise.
 
     Methods:
         get_queryset: Returns the queryset for this viewset.
@@ -563,6 +792,7 @@ class NotificationViewSet(ModelViewSet):
     """
     serializer_class = UserNotificationsSerializer
     permission_classes = [IsAuthenticated, NotificationsPermission]
+    pagination_class = KeysetPagination
 
     def get_queryset(self): 
         """
@@ -575,7 +805,7 @@ class NotificationViewSet(ModelViewSet):
         if self.request.user.is_staff:
             queryset = Notification.objects.all()
         else:
-            queryset = Notification.objects.filter(user=self.request.user)
+            queryset = Notification.objects.filter(user_id=self.request.user.id)
         
         last_received = self.request.query_params.get('LastReceived')
         if last_received:
@@ -609,7 +839,7 @@ class NotificationViewSet(ModelViewSet):
                 raise serializers.ValidationError({"user": "Target user must be specified."})
         else:
             # Regular users can only create notifications for themselves
-            serializer.save(user=self.request.user)
+            serializer.save(user_id=self.request.user.id)
 
 class ProductImageViewSet(ModelViewSet):
     """
@@ -1,2 +1 @@
-import celery
-from .celery import Celery
+from .celery import celery_app
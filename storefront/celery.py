@@ -1,6 +1,5 @@
 import os
 from celery import Celery
-import celery
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "storefront.settings")
 
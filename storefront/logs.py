@@ -0,0 +1,101 @@
+"""
+Structured, non-blocking logging.
+
+Loggers hand records to QueueLogHandler, which only puts them on an
+in-memory queue. A QueueListener thread per process formats them as JSON
+lines and writes them to the console and the log file, so request threads
+never wait on disk or on JSON encoding. Messages use %-style arguments,
+which are only interpolated for enabled levels, and on the logging thread
+before the record is queued, so the listener never touches request objects.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed with `extra=`.
+RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including `extra` fields."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'file': f'{record.pathname}:{record.lineno}',
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        if record.stack_info:
+            payload['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Queues records for a background QueueListener writing JSON lines.
+
+    Args:
+        filename (str): Log file, opened on the first write. None disables it.
+        console (bool): Also write to stderr.
+    """
+
+    def __init__(self, filename=None, console=True):
+        super().__init__(queue.SimpleQueue())
+        self.json_formatter = formatter = JSONFormatter()
+        self.targets = []
+        if console:
+            self.targets.append(logging.StreamHandler())
+        if filename:
+            self.targets.append(logging.FileHandler(filename, delay=True))
+        for handler in self.targets:
+            handler.setFormatter(formatter)
+
+        self.listener = None
+        self.start()
+        atexit.register(self.stop)
+        # The listener thread doesn't survive fork() (Celery prefork, gunicorn --preload).
+        os.register_at_fork(after_in_child=self.start)
+
+    def start(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """Writes out everything still queued and stops the listener."""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def prepare(self, record):
+        # Merge the message and render the traceback now: arguments may be
+        # mutable objects, model instances or querysets that must not be
+        # rendered later on the listener thread. The copy keeps the original
+        # record intact for other handlers.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.json_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self):
+        self.stop()
+        for handler in self.targets:
+            handler.close()
+        super().close()
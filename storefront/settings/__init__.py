@@ -0,0 +1,13 @@
+"""
+Settings package.
+
+DJANGO_SETTINGS_MODULE=storefront.settings loads the profile named by the
+DJANGO_ENV environment variable ('dev' by default, or 'prod'). A profile can
+also be chosen directly with storefront.settings.dev / storefront.settings.prod.
+"""
+from decouple import config
+
+if config('DJANGO_ENV', default='dev') == 'prod':
+    from .prod import *  # noqa
+else:
+    from .dev import *  # noqa
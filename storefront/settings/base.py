@@ -1,5 +1,8 @@
 """
-Django settings for storefront project.
+Django settings for storefront project, shared by every profile.
+
+Profile specific settings live in dev.py and prod.py, see __init__.py for
+how one is selected.
 
 Generated by 'django-admin startproject' using Django 5.1.
 
@@ -10,18 +13,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
-from ctypes import cast
 from pathlib import Path
 from datetime import timedelta
 import os
-from unittest.mock import DEFAULT
 from decouple import config
-from django import conf
-from celery.schedules import crontab
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # media dir:
 
@@ -36,8 +35,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 SECRET_KEY = 'django-insecure-ll_hj^4joahd#p&sh_x6)2#3g4xcbx94^f!dbfc@aas-u&n_@k'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-SILK = config('SILK', cast=bool)
+DEBUG = False
+SILK = False
 
 ALLOWED_HOSTS = []
 
@@ -54,11 +53,8 @@ INSTALLED_APPS = [
 
 
     # Third party apps
-    'debug_toolbar',
-    'django_extensions',
     'django_filters',
     'rest_framework',
-    'drf_yasg',
     'djoser',
     'corsheaders',
 
@@ -73,24 +69,25 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'store.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'store.middleware.NotificationBufferMiddleware',
 ]
 
-if DEBUG and SILK:
-    MIDDLEWARE.insert(0, 'silk.middleware.SilkyMiddleware')
-    INSTALLED_APPS.append('silk')
-
 ROOT_URLCONF = 'storefront.urls'
 
+# Serve the Swagger / ReDoc views (needs drf_yasg in INSTALLED_APPS).
+API_DOCS = False
+# Seconds a generated API schema is cached, 0 rebuilds it on every request.
+API_DOCS_CACHE_TIMEOUT = 0
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -134,6 +131,25 @@ POSTGRES = {
     }
 }
 
+# Connection reuse for gunicorn and Celery workers (DB_POOL_MODE):
+# - 'persistent': keep each worker's connection open for DB_CONN_MAX_AGE
+#   seconds, checking it is still usable before reusing it.
+# - 'pool': Django's psycopg connection pool (needs psycopg[pool] 3, the
+#   psycopg2 driver does not support it).
+# - 'none': a new connection per request / task.
+# Celery closes obsolete connections around every task, so both apply there too.
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+if DB_POOL_MODE == 'persistent':
+    POSTGRES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+    POSTGRES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    POSTGRES['default']['ENGINE'] = 'django.db.backends.postgresql'
+    POSTGRES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
 DATABASES = POSTGRES
 
 
@@ -202,10 +218,21 @@ if DEVELOPER_MODE:
     REST_FRAMEWORK = {
         'EXCEPTION_HANDLER': 'store.utils.custom_exception_handler',
         'COERCE_DECIMAL_TO_STRING': False,
+        'DEFAULT_RENDERER_CLASSES': [
+            'store.renderers.UJSONRenderer',
+            'store.renderers.MessagePackRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+        'DEFAULT_PARSER_CLASSES': [
+            'store.parsers.UJSONParser',
+            'store.parsers.MessagePackParser',
+            'rest_framework.parsers.FormParser',
+            'rest_framework.parsers.MultiPartParser',
+        ],
         # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
         'DEFAULT_AUTHENTICATION_CLASSES': (
             'rest_framework.authentication.SessionAuthentication',
-            'rest_framework_simplejwt.authentication.JWTAuthentication',
+            'core.authentication.TokenUserAuthentication',
         ),
         'DEFAULT_PERMISSION_CLASSES': [
             'rest_framework.permissions.IsAuthenticated',
@@ -215,7 +242,8 @@ if DEVELOPER_MODE:
     SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('ACCESS_TOKEN_LIFETIME', cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=config('REFRESH_TOKEN_LIFETIME', cast=int)),
-    'AUTH_HEADER_TYPES': ('Bearer',)
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'core.serializers.TokenObtainPairSerializer',
     }
 
 
@@ -259,6 +287,11 @@ CELERY_BEAT_SCHEDULE = {
 }
 
 
+# Hand buffered notifications to the `store.tasks.create_notifications` Celery
+# task instead of writing them at the end of the request.
+NOTIFICATIONS_ASYNC = config('NOTIFICATIONS_ASYNC', default=False, cast=bool)
+
+
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
@@ -269,32 +302,53 @@ CACHES = {
     }
 }
 
+# Seconds a cached catalog response (products list/retrieve) is kept.
+# Entries are also invalidated whenever a product, image or collection changes.
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=60 * 5, cast=int)
+
+# Seconds the active/staff status of a token-authenticated user is cached
+# (see core/authentication.py). Saving a User clears it immediately.
+USER_STATUS_CACHE_TIMEOUT = config('USER_STATUS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Render product, collection and order lists from .values() rows instead of
+# the ModelSerializers (see store/fastpath.py). The output is identical.
+FAST_LIST_SERIALIZATION = config('FAST_LIST_SERIALIZATION', default=True, cast=bool)
 
+# Budget for django.setup() plus the URLConf import, enforced in CI with
+# `manage.py import_audit` (see store/management/commands/import_audit.py).
+IMPORT_TIME_BUDGET_MS = config('IMPORT_TIME_BUDGET_MS', default=1500, cast=float)
 
+# Rows staged and upserted per transaction by `manage.py import_products` and
+# POST /store/products/bulk/ (see store/importer.py).
+PRODUCT_IMPORT_BATCH_SIZE = config('PRODUCT_IMPORT_BATCH_SIZE', default=5000, cast=int)
+
+# Rows fetched per server-side cursor round trip by the streaming exports
+# (GET /store/products/export/, /store/orders/export/, see store/exports.py).
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Compression of API responses (see store/middleware.py): bodies under
+# COMPRESSION_MIN_SIZE bytes are sent as is, and Brotli runs at
+# COMPRESSION_BROTLI_QUALITY (0-11, higher is smaller but slower).
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+
+# Records are queued and written as JSON lines by a background thread, see
+# storefront/logs.py. LOG_FILE='' logs to the console only.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler'
+        'queue': {
+            '()': 'storefront.logs.QueueLogHandler',
+            'filename': config('LOG_FILE', default='general.log'),
+            'console': True,
         },
-        'file': {
-            'class': 'logging.FileHandler',
-            'filename': 'general.log',
-            'formatter': 'verbose'
-        }
     },
     'loggers': {
         '': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': os.environ.get("DJANGO_LOG_LEVEL", "INFO")
         }
     },
-    'formatters': {
-        'verbose': {
-            'format': '{asctime} ({levelname}) - {name} {message}',
-            'style': '{',
-        }
-    }
-
 }
@@ -0,0 +1,25 @@
+"""
+Development profile: debug toolbar, django-extensions, Swagger and
+optionally silk on top of the base settings.
+"""
+from .base import *  # noqa
+
+DEBUG = True
+SILK = config('SILK', cast=bool)
+
+INSTALLED_APPS = [
+    *INSTALLED_APPS,
+    'debug_toolbar',
+    'django_extensions',
+    'drf_yasg',
+]
+
+MIDDLEWARE = [*MIDDLEWARE]
+MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware'),
+                  'debug_toolbar.middleware.DebugToolbarMiddleware')
+
+if DEBUG and SILK:
+    MIDDLEWARE.insert(0, 'silk.middleware.SilkyMiddleware')
+    INSTALLED_APPS.append('silk')
+
+API_DOCS = True
@@ -0,0 +1,41 @@
+"""
+Production profile.
+
+Runs the base middleware chain only (no debug toolbar or silk), without the
+dev-only apps, with cached template loaders and without the browsable API.
+The Swagger / ReDoc views are off unless API_DOCS is set, and their schema is
+then generated on first use and cached.
+"""
+from .base import *  # noqa
+
+DEBUG = False
+# Required: the base key is committed, so never fall back to it.
+SECRET_KEY = config('SECRET_KEY')
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=lambda v: [host.strip() for host in v.split(',') if host.strip()])
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        renderer for renderer in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        if renderer != 'rest_framework.renderers.BrowsableAPIRenderer'
+    ],
+}
+
+API_DOCS = config('API_DOCS', default=False, cast=bool)
+API_DOCS_CACHE_TIMEOUT = config('API_DOCS_CACHE_TIMEOUT', default=60 * 60, cast=int)
+if API_DOCS:
+    INSTALLED_APPS = [*INSTALLED_APPS, 'drf_yasg']
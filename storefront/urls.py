@@ -17,41 +17,60 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from rest_framework.permissions import IsAuthenticated
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-import debug_toolbar
 
 admin.site.site_header = 'Karyar OnlineShop Admin'
 admin.site.index_title = 'Admin'
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title='E Commerce',
-        default_version='v1',
-        description='Still developing...',
-        terms_of_service='https://www.google.com/policies/terms/',
-        contact=openapi.Contact(email='samannaruee@gmail.com'),
-        license=openapi.License(name='BSD License'),
-    ),
-    public=True,
-    permission_classes=[]  # ✅ No authentication required for Swagger UI, Actual values is: (IsAuthenticated,)
-)
+
+def lazy_schema_view(renderer):
+    """
+    Returns a view building the drf_yasg schema view on its first request,
+    so workers don't import drf_yasg or generate the schema at startup.
+    The rendered schema is cached for settings.API_DOCS_CACHE_TIMEOUT seconds.
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from drf_yasg import openapi
+            from drf_yasg.views import get_schema_view
+
+            schema_view = get_schema_view(
+                openapi.Info(
+                    title='E Commerce',
+                    default_version='v1',
+                    description='Still developing...',
+                    terms_of_service='https://www.google.com/policies/terms/',
+                    contact=openapi.Contact(email='samannaruee@gmail.com'),
+                    license=openapi.License(name='BSD License'),
+                ),
+                public=True,
+                permission_classes=[]  # ✅ No authentication required for Swagger UI, Actual values is: (IsAuthenticated,)
+            )
+            view = schema_view.with_ui(renderer, cache_timeout=settings.API_DOCS_CACHE_TIMEOUT)
+        return view(request, *args, **kwargs)
+    return dispatch
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('playground/', include('playground.urls')),
     path('store/', include('store.urls')),
     path('api/', include('core.urls')),
-    # Django debug toolbar
-    path('__debug__/', include(debug_toolbar.urls)),
-
-    # swagger
-    path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),  
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),  
 ]
 
+if settings.API_DOCS:
+    urlpatterns += [
+        # swagger
+        path('', lazy_schema_view('swagger'), name='schema-swagger-ui'),
+        path('redoc/', lazy_schema_view('redoc'), name='schema-redoc'),
+    ]
+
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    # Django debug toolbar
+    urlpatterns += [path('__debug__/', include('debug_toolbar.urls'))]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     if settings.SILK: